@@ -0,0 +1,205 @@
+"""
+In-memory stand-ins for the parts of discord.py the bot touches: channels,
+messages, users and command contexts. Every REST-like call sleeps for
+`latency` and is counted in FakeDiscord.calls.
+"""
+import asyncio
+import itertools
+from collections import Counter
+from types import SimpleNamespace
+
+import discord
+
+_ids = itertools.count(10_000)
+
+
+def _not_found():
+    return discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+
+
+class FakeUser:
+    def __init__(self, fake, name: str, bot: bool = False, role_ids=(), role_names=None, user_id: int = None):
+        self._fake = fake
+        self.id = next(_ids) if user_id is None else user_id
+        self.name = name
+        self.bot = bot
+        self.role_ids = set(role_ids)
+        self.role_names = dict(role_names or {})  # role id -> name, for name-based checks like has_role
+        self.mention = f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def roles(self):
+        return [SimpleNamespace(id=r, name=self.role_names.get(r)) for r in self.role_ids]
+
+    def get_role(self, role_id: int):
+        return SimpleNamespace(id=role_id) if role_id in self.role_ids else None
+
+    async def send(self, content=None, **kwargs):
+        await self._fake.call("dm")
+
+
+class FakeMessage:
+    def __init__(self, fake, channel, author, content=None, embed=None):
+        self._fake = fake
+        self.id = next(_ids)
+        self.channel = channel
+        self.author = author
+        self.content = content or ""
+        self.embeds = [embed] if embed else []
+
+    async def edit(self, content=discord.utils.MISSING, embed=discord.utils.MISSING, **kwargs):
+        await self._fake.call("edit")
+        if self.id not in self.channel.messages:
+            raise _not_found()
+        if content is not discord.utils.MISSING:
+            self.content = content or ""
+        if embed is not discord.utils.MISSING:
+            self.embeds = [embed] if embed else []
+        return self
+
+    async def add_reaction(self, emoji):
+        await self._fake.call("reaction")
+
+    async def clear_reactions(self):
+        await self._fake.call("reaction")
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+class FakePartialMessage:
+    def __init__(self, channel, message_id: int):
+        self.channel = channel
+        self.id = message_id
+
+    def _target(self):
+        msg = self.channel.messages.get(self.id)
+        if msg is None:
+            raise _not_found()
+        return msg
+
+    async def edit(self, **kwargs):
+        msg = self.channel.messages.get(self.id)
+        if msg is None:
+            await self.channel._fake.call("edit")
+            raise _not_found()
+        return await msg.edit(**kwargs)
+
+    async def add_reaction(self, emoji):
+        await self._target().add_reaction(emoji)
+
+    async def clear_reactions(self):
+        await self._target().clear_reactions()
+
+
+class FakeChannel:
+    def __init__(self, fake, channel_id: int):
+        self._fake = fake
+        self.id = channel_id
+        self.messages = {}  # id -> FakeMessage, oldest first
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self._fake.call("send")
+        msg = FakeMessage(self._fake, self, self._fake.bot_user, content, embed)
+        self.messages[msg.id] = msg
+        return msg
+
+    async def fetch_message(self, message_id: int):
+        await self._fake.call("fetch")
+        msg = self.messages.get(message_id)
+        if msg is None:
+            raise _not_found()
+        return msg
+
+    def get_partial_message(self, message_id: int):
+        return FakePartialMessage(self, message_id)
+
+    async def history(self, limit: int = 100):
+        await self._fake.call("history")
+        for msg in list(reversed(self.messages.values()))[:limit]:
+            yield msg
+
+
+class FakeContext:
+    """enough of commands.Context for calling a command's callback directly"""
+
+    def __init__(self, fake, author: FakeUser, channel: FakeChannel):
+        self._fake = fake
+        self.author = author
+        self.channel = channel
+        self.guild = fake.guild
+        self.interaction = None
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def defer(self, **kwargs):
+        pass
+
+
+class FakeDiscord:
+    """
+    Owns the fake channels/users and patches them into a loaded main.py via
+    install(). `calls` counts edits, sends, fetches, history scans, DMs and
+    reactions.
+    """
+
+    def __init__(self, latency: float = 0.03):
+        self.latency = latency
+        self.calls = Counter()
+        self.channels = {}
+        self.users = {}
+        self.bot_user = FakeUser(self, "musicbot", bot=True)
+        self.guild = SimpleNamespace(id=next(_ids), name="bench guild")
+
+    async def call(self, kind: str):
+        self.calls[kind] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def channel(self, channel_id: int):
+        ch = self.channels.get(channel_id)
+        if ch is None:
+            ch = self.channels[channel_id] = FakeChannel(self, channel_id)
+        return ch
+
+    def user(self, name: str, role_ids=(), role_names=None, user_id: int = None):
+        user = FakeUser(self, name, role_ids=role_ids, role_names=role_names, user_id=user_id)
+        self.users[user.id] = user
+        return user
+
+    def context(self, author: FakeUser, channel_id: int = 1):
+        return FakeContext(self, author, self.channel(channel_id))
+
+    def reaction(self, message_id: int, emoji: str, member: FakeUser):
+        return SimpleNamespace(
+            message_id=message_id,
+            channel_id=None,
+            guild_id=self.guild.id,
+            user_id=member.id,
+            emoji=emoji,
+            member=member,
+        )
+
+    def install(self, main):
+        bot = main.bot
+
+        async def fetch_channel(channel_id):
+            await self.call("fetch")
+            return self.channel(channel_id)
+
+        async def fetch_user(user_id):
+            await self.call("fetch")
+            return self.users.get(user_id) or self.bot_user
+
+        bot.get_channel = self.channel
+        bot.fetch_channel = fetch_channel
+        bot.get_user = self.users.get
+        bot.fetch_user = fetch_user
+        bot._connection.user = self.bot_user
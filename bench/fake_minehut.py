@@ -0,0 +1,123 @@
+"""
+Local stand-in for api.minehut.com, served by aiohttp on 127.0.0.1.
+
+GET  /server/{id}           -> {"server": {...}} with the simulated state
+POST /server/{id}/{action}  -> start_service / shutdown, the new state shows
+                               up `transition` seconds later
+"""
+import asyncio
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+
+class FakeServer:
+    def __init__(self, server_id: str, online: bool = False):
+        self.id = server_id
+        self.online = online
+        self.player_count = 0
+        self.max_players = 10
+        self.last_online = int(time.time() * 1000)
+        self._pending = None  # asyncio.TimerHandle of the running transition
+
+    def to_json(self):
+        return {
+            "_id": self.id,
+            "name": self.id,
+            "online": self.online,
+            "playerCount": self.player_count if self.online else 0,
+            "maxPlayers": self.max_players,
+            "server_plan": "FREE",
+            "ram": 1024,
+            "last_online": self.last_online,
+        }
+
+
+class FakeMinehut:
+    """
+    latency / jitter: seconds added to every response
+    error_rate: fraction of requests answered with 503 (and Retry-After)
+    transition: seconds between a power action and the state flipping
+    """
+
+    def __init__(self, servers=("srv1", "srv2"), online: bool = False, latency: float = 0.05,
+                 jitter: float = 0.02, error_rate: float = 0.0, transition: float = 2.0):
+        self.servers = {sid: FakeServer(sid, online) for sid in servers}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.transition = transition
+        self.calls = Counter()  # "status" / action name -> requests received
+        self.url = None
+        self._runner = None
+
+    def reset(self, online: bool = None):
+        self.calls.clear()
+        for server in self.servers.values():
+            if server._pending is not None:
+                server._pending.cancel()
+                server._pending = None
+            if online is not None:
+                server.online = online
+
+    async def _delay(self):
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def _failed(self):
+        if self.error_rate and random.random() < self.error_rate:
+            return web.Response(status=503, headers={"Retry-After": "0.2"}, text="unavailable")
+        return None
+
+    async def _status(self, request):
+        self.calls["status"] += 1
+        await self._delay()
+        failed = self._failed()
+        if failed is not None:
+            return failed
+        server = self.servers.get(request.match_info["server_id"])
+        if server is None:
+            return web.json_response({"message": "not found"}, status=404)
+        return web.json_response({"server": server.to_json()})
+
+    async def _power(self, request):
+        action = request.match_info["action"]
+        self.calls[action] += 1
+        await self._delay()
+        failed = self._failed()
+        if failed is not None:
+            return failed
+        server = self.servers.get(request.match_info["server_id"])
+        if server is None or action not in ("start_service", "shutdown"):
+            return web.json_response({"message": "not found"}, status=404)
+
+        target = action == "start_service"
+
+        def flip():
+            server.online = target
+            server._pending = None
+            if target:
+                server.last_online = int(time.time() * 1000)
+
+        if server._pending is not None:
+            server._pending.cancel()
+        server._pending = asyncio.get_running_loop().call_later(self.transition, flip)
+        return web.json_response({})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        app = web.Application()
+        app.router.add_get("/server/{server_id}", self._status)
+        app.router.add_post("/server/{server_id}/{action}", self._power)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        self.reset()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,272 @@
+"""
+Replays a recording made with RECORD_FILE=... (EventRecorder in main.py)
+through the bot offline. Commands go through bot.invoke, so checks, hooks
+and on_command_error run as they did live; reactions go through
+on_raw_reaction_add; Minehut is a local stub answering every request with
+the recorded responses in order.
+
+    python -m bench.replay incident.jsonl              # original timing
+    python -m bench.replay incident.jsonl --speed 10   # 10x faster
+    python -m bench.replay incident.jsonl --speed 0    # as fast as possible
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from collections import Counter, defaultdict, deque
+
+from aiohttp import web
+from discord.ext import commands
+
+from .harness import Harness
+from .run import percentile
+
+_ids = itertools.count(900_000)
+
+
+def load_recording(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return sorted(events, key=lambda e: e["t"])
+
+
+class ReplayMinehut:
+    """
+    Minehut stub fed from a recording: each (method, path) answers with its
+    recorded responses in order and repeats the last one once they run out.
+    latency=False answers right away instead of after the recorded latency.
+    """
+
+    def __init__(self, events, latency: bool = True):
+        self.latency = latency
+        self.calls = Counter()  # same keys as FakeMinehut: "status" / action name
+        self.recorded = Counter()
+        self._responses = defaultdict(list)
+        for e in events:
+            if e["kind"] == "minehut":
+                self._responses[(e["method"], e["path"])].append(e)
+                self.recorded[self._kind(e["method"], e["path"])] += 1
+        self._queues = {}
+        self._runner = None
+        self.url = None
+        self.reset()
+
+    @staticmethod
+    def _kind(method: str, path: str):
+        return "status" if method == "GET" else path.rsplit("/", 1)[-1]
+
+    def reset(self, online: bool = None):
+        # `online` is accepted for Harness.reset(), the recording decides the state
+        self.calls.clear()
+        self._queues = {key: deque(responses) for key, responses in self._responses.items()}
+
+    async def _handle(self, request):
+        self.calls[self._kind(request.method, request.path)] += 1
+        queue = self._queues.get((request.method, request.path))
+        if not queue:
+            return web.json_response({"message": "not in the recording"}, status=404)
+        e = queue.popleft() if len(queue) > 1 else queue[0]
+        if self.latency and e.get("latency"):
+            await asyncio.sleep(e["latency"])
+        if e.get("status") is None:
+            # recorded as a connection error/timeout, closest thing the client retries too
+            return web.Response(status=503, text=e.get("error") or "")
+        headers = {"Retry-After": e["retry_after"]} if e.get("retry_after") else None
+        return web.Response(status=e["status"], text=e.get("body") or "", headers=headers,
+                            content_type="application/json")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class ReplayMessage:
+    """just enough of discord.Message for Bot.get_context"""
+
+    def __init__(self, bot, content: str, author, channel, guild):
+        self._state = bot._connection
+        self.id = next(_ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.attachments = []
+
+
+class ReplayContext(commands.Context):
+    """commands.Context whose replies land in the fake channel"""
+
+    async def send(self, content=None, **kwargs):
+        kwargs = {k: v for k, v in kwargs.items() if k == "embed"}
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.send(content, **kwargs)
+
+    async def defer(self, **kwargs):
+        pass
+
+
+class Replayer:
+    def __init__(self, h: Harness, events, speed: float = 1.0):
+        self.h = h
+        self.events = events
+        self.speed = speed
+        self.users = {}
+        self.latencies = []
+        self.failed = 0
+        self.skipped = Counter()
+        # stop requests in the order they were opened, recorded ids vs replayed ids
+        self.recorded_requests = [e["message_id"] for e in events if e["kind"] == "stop_request"]
+        self.replayed_requests = []
+        self._request_added = asyncio.Event()
+
+    def _user(self, u: dict):
+        user = self.users.get(u["id"])
+        if user is None:
+            roles = {role_id: name for role_id, name in u.get("roles") or ()}
+            user = self.users[u["id"]] = self.h.discord.user(
+                u["name"], role_ids=roles, role_names=roles, user_id=u["id"]
+            )
+        return user
+
+    def _track_stop_requests(self):
+        registry = self.h.main.stop_requests
+        add = registry.add
+
+        def tracked_add(message_id, record):
+            self.replayed_requests.append(message_id)
+            self._request_added.set()
+            return add(message_id, record)
+
+        registry.add = tracked_add
+
+    async def _command(self, e):
+        m = self.h.main
+        channel = self.h.discord.channel(e["channel"])
+        msg = ReplayMessage(m.bot, e["content"], self._user(e["user"]), channel, self.h.discord.guild)
+        ctx = await m.bot.get_context(msg, cls=ReplayContext)
+        started = time.perf_counter()
+        await m.bot.invoke(ctx)
+        self.latencies.append(time.perf_counter() - started)
+        if ctx.command_failed:
+            self.failed += 1
+
+    async def _reaction(self, e, timeout: float = 10):
+        try:
+            index = self.recorded_requests.index(e["message_id"])
+        except ValueError:
+            # request opened before the recording started
+            self.skipped["reaction"] += 1
+            return
+        deadline = time.monotonic() + timeout
+        while len(self.replayed_requests) <= index:
+            self._request_added.clear()
+            try:
+                await asyncio.wait_for(self._request_added.wait(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self.skipped["reaction"] += 1
+                return
+        payload = self.h.discord.reaction(self.replayed_requests[index], e["emoji"], self._user(e["user"]))
+        await self.h.main.on_raw_reaction_add(payload)
+
+    async def run(self):
+        self._track_stop_requests()
+        handlers = {"command": self._command, "reaction": self._reaction}
+        tasks = []
+        started = time.perf_counter()
+        for e in self.events:
+            handler = handlers.get(e["kind"])
+            if handler is None:
+                continue
+            if self.speed > 0:
+                delay = e["t"] / self.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(handler(e)))
+            # let it start before the next event, keeps the recorded order
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return time.perf_counter() - started
+
+
+def _apply_header(events):
+    """points the bot at the recorded server ids before main is imported"""
+    header = next((e for e in events if e["kind"] == "start"), None)
+    if header is None:
+        return None
+    for number, server_id in header.get("servers", {}).items():
+        os.environ[f"MINEHUT_SERVERID{number}"] = server_id
+    return header.get("active")
+
+
+async def replay(path: str, speed: float = 1.0, latency: bool = True, discord_latency: float = 0.03):
+    events = load_recording(path)
+    active = _apply_header(events)
+    stub = ReplayMinehut(events, latency=latency)
+    h = Harness(discord_latency=discord_latency, minehut=stub)
+    await h.start()
+    m = h.main
+    # bot.invoke dispatches events, which needs the client bound to this loop
+    await m.bot._async_setup_hook()
+    try:
+        await h.reset()
+        if active in m.SERVERS:
+            m.CURRENT_SERVER_NUMBER = active
+            m.SERVER_ID = m._get_server_id_from_number(active)
+        r = Replayer(h, events, speed=speed)
+        replay_s = await r.run()
+        settled = await h.settle()
+        # copied before stop(), which resets the counters
+        minehut_calls = dict(stub.calls)
+        discord_calls = dict(h.discord.calls)
+    finally:
+        await h.stop()
+
+    kinds = Counter(e["kind"] for e in events)
+    return {
+        "events": kinds["command"] + kinds["reaction"],
+        "commands": kinds["command"],
+        "reactions": kinds["reaction"],
+        "recorded_s": round(events[-1]["t"], 2) if events else 0,
+        "replay_s": round(replay_s, 2),
+        "events_per_s": round((kinds["command"] + kinds["reaction"]) / replay_s, 1) if replay_s else 0,
+        "cmd_p50_ms": round(percentile(r.latencies, 50) * 1000, 1),
+        "cmd_p95_ms": round(percentile(r.latencies, 95) * 1000, 1),
+        "cmd_failed": r.failed,
+        "minehut_recorded": dict(stub.recorded),
+        "minehut_replayed": minehut_calls,
+        "discord_calls": discord_calls,
+        "skipped": dict(r.skipped),
+        "settled": settled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = original timing, 0 = as fast as possible")
+    parser.add_argument("--no-latency", action="store_true", help="answer Minehut requests without the recorded latency")
+    parser.add_argument("--discord-latency", type=float, default=0.03)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(replay(args.recording, args.speed, not args.no_latency, args.discord_latency))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Offline benchmark: drives the bot's commands against FakeMinehut and
+FakeDiscord with N concurrent invocations and reports latency percentiles,
+Minehut calls per command and Discord calls per command.
+
+    python -m bench.run                    # every scenario, n=20
+    python -m bench.run -s startserver -n 50 --minehut-latency 0.2
+    python -m bench.run --profile stock     # without uvloop/aiodns/orjson
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from .harness import Harness
+
+
+def percentile(values, p: float):
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+async def _timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def scenario_status(h: Harness, n: int):
+    await h.reset(online=True)
+    return await asyncio.gather(*(_timed(h.main.get_minehut_status()) for _ in range(n)))
+
+
+async def scenario_refresh(h: Harness, n: int):
+    await h.reset(online=True)
+    return await asyncio.gather(*(
+        _timed(h.main.refresh_and_update(
+            trigger_by=f"user{i}", action_hint="bench refresh", immediate_state="running", wait_seconds=0,
+        ))
+        for i in range(n)
+    ))
+
+
+async def scenario_startserver(h: Harness, n: int):
+    await h.reset(online=False)
+    ctxs = [h.discord.context(u) for u in h.users(n)]
+    return await asyncio.gather(*(_timed(h.main.startserver.callback(ctx)) for ctx in ctxs))
+
+
+async def scenario_stopserver(h: Harness, n: int):
+    await h.reset(online=True)
+    ctxs = [h.discord.context(h.admin) for _ in range(n)]
+    return await asyncio.gather(*(_timed(h.main.stopserver.callback(ctx)) for ctx in ctxs))
+
+
+async def scenario_requeststop(h: Harness, n: int):
+    """each request is approved by an admin reaction; latency covers both"""
+    await h.reset(online=True)
+    m = h.main
+
+    async def flow(user):
+        await m.requeststop.callback(h.discord.context(user))
+        msg_id = next(k for k, r in m.stop_requests._requests.items() if r["requester_id"] == user.id)
+        await m.on_raw_reaction_add(h.discord.reaction(msg_id, "✅", h.admin))
+
+    return await asyncio.gather(*(_timed(flow(u)) for u in h.users(n)))
+
+
+async def scenario_switchserver(h: Harness, n: int):
+    """alternates between the first two servers, one switch at a time"""
+    await h.reset(online=True)
+    m = h.main
+    numbers = list(m.SERVERS)[:2]
+    ctx = h.discord.context(h.admin)
+    latencies = []
+    for i in range(n):
+        latencies.append(await _timed(m.switchserver.callback(ctx, msg=numbers[i % len(numbers)])))
+    return latencies
+
+
+SCENARIOS = {
+    "status": scenario_status,
+    "refresh": scenario_refresh,
+    "startserver": scenario_startserver,
+    "stopserver": scenario_stopserver,
+    "requeststop": scenario_requeststop,
+    "switchserver": scenario_switchserver,
+}
+
+
+async def run_scenario(h: Harness, name: str, n: int):
+    started = time.perf_counter()
+    latencies = await SCENARIOS[name](h, n)
+    settled = await h.settle()
+    wall = time.perf_counter() - started
+    api_calls = sum(h.minehut.calls.values())
+    d = h.discord.calls
+    return {
+        "scenario": name,
+        "n": n,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "api_calls_per_cmd": round(api_calls / n, 2),
+        "edits_per_cmd": round(d["edit"] / n, 2),
+        "discord_calls_per_cmd": round(sum(d.values()) / n, 2),
+        "wall_s": round(wall, 2),
+        "settled": settled,
+    }
+
+
+def _print_table(rows):
+    cols = ["scenario", "n", "p50_ms", "p95_ms", "p99_ms", "api_calls_per_cmd",
+            "edits_per_cmd", "discord_calls_per_cmd", "wall_s"]
+    widths = [max(len(c), *(len(str(r[c])) for r in rows)) for c in cols]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    for r in rows:
+        line = "  ".join(str(r[c]).ljust(w) for c, w in zip(cols, widths))
+        print(line + ("" if r["settled"] else "  (background work still running)"))
+
+
+async def main_async(args):
+    h = Harness(
+        minehut_latency=args.minehut_latency,
+        discord_latency=args.discord_latency,
+        error_rate=args.error_rate,
+        transition=args.transition,
+    )
+    await h.start()
+    try:
+        names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+        rows = [await run_scenario(h, name, args.n) for name in names]
+    finally:
+        await h.stop()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"runtime: {h.main._runtime_report()}")
+        _print_table(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", default="all", choices=["all", *SCENARIOS])
+    parser.add_argument("-n", type=int, default=20, help="concurrent invocations per scenario")
+    parser.add_argument("--minehut-latency", type=float, default=0.05)
+    parser.add_argument("--discord-latency", type=float, default=0.03)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Minehut requests answered 503")
+    parser.add_argument("--transition", type=float, default=2.0, help="seconds a start/shutdown takes")
+    parser.add_argument("--profile", choices=["fast", "stock"], help="RUNTIME_PROFILE for the bot (default: its own)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if args.profile:
+        os.environ["RUNTIME_PROFILE"] = args.profile
+    if os.environ.get("RUNTIME_PROFILE", "fast") == "fast":
+        # same as main.py's __main__: the loop policy has to be set before asyncio.run
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
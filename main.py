@@ -1,12 +1,42 @@
 import discord
 from discord.ext import commands
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from dotenv import load_dotenv
 import os
 import aiohttp
+from aiohttp import web
 from datetime import datetime
 import asyncio
+import hashlib
 import json
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import functools
+import traceback
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+_STARTED_AT = time.monotonic()
+
+# optional accelerators, used with RUNTIME_PROFILE=fast when installed
+try:
+    import orjson  # faster JSON for Minehut responses and the state file
+except ImportError:
+    orjson = None
+try:
+    import uvloop  # faster event loop
+except ImportError:
+    uvloop = None
+try:
+    import aiodns  # lets aiohttp resolve DNS without a thread pool
+except ImportError:
+    aiodns = None
 load_dotenv()
 
 # env keys
@@ -16,85 +46,769 @@ MINEHUT_TOKEN = os.getenv("MINEHUT_TOKEN")  # full "Bearer ey..." string
 ADMIN_ROLE_ID = 1475056910741934161
 REQUEST_CHANNEL_ID = 1475103838473162762
 STATUS_CHANNEL_ID = 1475054751581343915  # your target channel id
-STATUS_FILE = "status_message.json"       # stores message id so it persists across restarts
+STATE_FILE = "bot_state.json"             # message ids + active server, persists across restarts
 SERVER_IP_CHANNEL_ID = 1475037173962113128
+# older side files, migrated into STATE_FILE on first start
+STATUS_FILE = "status_message.json"
 SERVER_IP_FILE = "server_ip_message.json"
 ACTIVE_SERVER_FILE = "active_server.json"
-_status_lock = asyncio.Lock()
-_server_ip_lock = asyncio.Lock()
+MINEHUT_API_BASE = os.getenv("MINEHUT_API_BASE", "https://api.minehut.com")
+MINEHUT_RATE = int(os.getenv("MINEHUT_RATE", "10"))              # outbound Minehut calls allowed...
+MINEHUT_RATE_PER = float(os.getenv("MINEHUT_RATE_PER", "10"))     # ...per this many seconds
+MINEHUT_STATUS_TTL = float(os.getenv("MINEHUT_STATUS_TTL", "2"))  # seconds a status read is reused
+STATUS_POLL_FAST = float(os.getenv("STATUS_POLL_FAST", "3"))    # poll interval during start/shutdown
+STATUS_POLL_SLOW = float(os.getenv("STATUS_POLL_SLOW", "300"))  # max poll interval when stable
+DASHBOARD_CONCURRENCY = int(os.getenv("DASHBOARD_CONCURRENCY", "5"))  # parallel fetches for !serverstatus all
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))             # 0 = no /metrics endpoint
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+STATUS_API_PORT = int(os.getenv("STATUS_API_PORT", "0"))       # 0 = no /status endpoint, may equal METRICS_PORT
+STATUS_API_HOST = os.getenv("STATUS_API_HOST", "127.0.0.1")
+STATUS_API_MAX_AGE = int(os.getenv("STATUS_API_MAX_AGE", "5"))  # Cache-Control max-age for /status, seconds
+DISCORD_EDIT_RATE = int(os.getenv("DISCORD_EDIT_RATE", "5"))       # edits allowed per channel...
+DISCORD_EDIT_PER = float(os.getenv("DISCORD_EDIT_PER", "5"))       # ...per this many seconds
+RUNTIME_PROFILE = os.getenv("RUNTIME_PROFILE", "fast").lower()   # fast: use whatever accelerators are installed, stock: none
+LEAN_GATEWAY = os.getenv("LEAN_GATEWAY", "0") == "1"             # no members intent/chunking, small caches
+LEAN_MAX_MESSAGES = int(os.getenv("LEAN_MAX_MESSAGES", "100"))    # message cache size in lean mode (0 = off)
+PROGRESS_DELAY = float(os.getenv("PROGRESS_DELAY", "1.5"))        # seconds a command's first reply is held back
+SYNC_APP_COMMANDS = os.getenv("SYNC_APP_COMMANDS", "0") == "1"    # push slash commands to Discord on startup
+# extra channels (ids, comma separated) that get a live copy of the status embed and IP message
+STATUS_MIRROR_CHANNELS = [int(c) for c in os.getenv("STATUS_MIRROR_CHANNELS", "").replace(" ", "").split(",") if c]
+MIRROR_CONCURRENCY = int(os.getenv("MIRROR_CONCURRENCY", "5"))   # mirror edits sent to Discord at once
+NOTIFY_TTL = float(os.getenv("NOTIFY_TTL", str(2 * 3600)))        # seconds a !notifyme subscription lasts
+NOTIFY_POLL_INTERVAL = float(os.getenv("NOTIFY_POLL_INTERVAL", "30"))  # max poll interval while someone is waiting
+NOTIFY_DM_CONCURRENCY = int(os.getenv("NOTIFY_DM_CONCURRENCY", "3"))   # DMs in flight at once
+NOTIFY_DM_RATE = int(os.getenv("NOTIFY_DM_RATE", "5"))               # DMs allowed...
+NOTIFY_DM_PER = float(os.getenv("NOTIFY_DM_PER", "5"))               # ...per this many seconds
+HISTORY_DB = os.getenv("HISTORY_DB", "status_history.db")          # sqlite file for !uptime / !history
+HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "180"))  # older rows are deleted
+HISTORY_RING = int(os.getenv("HISTORY_RING", "500"))              # runs per server kept in memory
+LOOP_WATCHDOG = os.getenv("LOOP_WATCHDOG", "0") == "1"           # trace what blocks the event loop (see !perf)
+LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0.1"))  # seconds of loop lag that count as a stall
+RECORD_FILE = os.getenv("RECORD_FILE")                           # record commands/reactions/Minehut responses (bench/replay.py)
+LOG_FILE = os.getenv("LOG_FILE", "discord.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()                  # our own loggers
+DISCORD_LOG_LEVEL = os.getenv("DISCORD_LOG_LEVEL", "INFO").upper()  # discord.py (DEBUG logs every gateway event)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))  # rotate the log file at this size...
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))                       # ...keeping this many old files
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))           # records buffered before new ones are dropped
+LOG_PAYLOAD_CHARS = int(os.getenv("LOG_PAYLOAD_CHARS", "200"))       # max chars of a response body in the log
+
+log = logging.getLogger("musicbot")
+
+# accelerator -> used in this run; missing ones fall back to the stock component
+ACCELERATORS = {
+    "uvloop": RUNTIME_PROFILE == "fast" and uvloop is not None,
+    "aiodns": RUNTIME_PROFILE == "fast" and aiodns is not None,
+    "orjson": RUNTIME_PROFILE == "fast" and orjson is not None,
+}
+_orjson = orjson if ACCELERATORS["orjson"] else None
+
+def _json_loads(data):
+    return _orjson.loads(data) if _orjson is not None else json.loads(data)
+
+def _json_dumps(obj):
+    return _orjson.dumps(obj).decode("utf-8") if _orjson is not None else json.dumps(obj)
+
+def _runtime_report():
+    loop = type(asyncio.get_running_loop())
+    active = [name for name, on in ACCELERATORS.items() if on]
+    missing = [name for name, on in ACCELERATORS.items() if not on]
+    text = f"{RUNTIME_PROFILE} profile, loop {loop.__module__}.{loop.__name__}"
+    if active:
+        text += f", using {', '.join(active)}"
+    if missing and RUNTIME_PROFILE == "fast":
+        text += f" ({', '.join(missing)} not installed)"
+    return text
+
+def _rss_bytes():
+    """current resident set size, or peak RSS where /proc isn't available"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+def _truncate(text, limit: int = None):
+    limit = LOG_PAYLOAD_CHARS if limit is None else limit
+    text = "" if text is None else str(text)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more chars)"
+
+class _BoundedQueueHandler(QueueHandler):
+    """
+    Only puts the record on the queue; formatting happens on the listener
+    thread. When the queue is full the record is dropped (and counted)
+    instead of blocking the event loop.
+    """
+
+    dropped = 0
+
+    def prepare(self, record):
+        # same process, no need to pre-format/pickle-proof the record here
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def setup_logging():
+    """
+    Routes every logger (ours and discord.py's) through one bounded queue.
+    A QueueListener thread writes to a size-rotated LOG_FILE and the console,
+    so a log call on the event loop costs a queue put. Returns the listener,
+    stop() it on exit to flush.
+    """
+    fmt = logging.Formatter("[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{")
+    file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    console = logging.StreamHandler()
+    for h in (file_handler, console):
+        h.setFormatter(fmt)
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(_BoundedQueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    log.setLevel(LOG_LEVEL)
+    logging.getLogger("discord").setLevel(DISCORD_LOG_LEVEL)
+
+    listener = QueueListener(log_queue, file_handler, console, respect_handler_level=True)
+    listener.start()
+    return listener
+
+class RateBucket:
+    """
+    Token bucket: at most `rate` acquisitions per `per` seconds, with bursts
+    up to `rate`.
+    """
+
+    def __init__(self, rate: int, per: float):
+        self.rate = max(1, rate)
+        self.per = per
+        self.tokens = float(self.rate)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+# histogram buckets in seconds
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+TRANSITION_BUCKETS = (5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+
+class Metrics:
+    """
+    Tiny in-process metrics registry (counters, gauges, histograms) rendered
+    in the Prometheus text format. Labels are passed as keyword arguments.
+    """
+
+    def __init__(self):
+        self._types = {}       # name -> counter/gauge/histogram
+        self._help = {}
+        self._values = {}      # (name, labels) -> float
+        self._hists = {}       # (name, labels) -> [bucket counts, sum, count]
+        self._buckets = {}     # histogram name -> bucket bounds
+        self._gauge_fns = {}   # name -> callable returning the current value
+
+    def describe(self, name: str, kind: str, help_text: str, buckets=None):
+        self._types[name] = kind
+        self._help[name] = help_text
+        if kind == "histogram":
+            self._buckets[name] = tuple(buckets or LATENCY_BUCKETS)
+
+    def gauge_fn(self, name: str, help_text: str, fn):
+        self.describe(name, "gauge", help_text)
+        self._gauge_fns[name] = fn
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        self._values[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        h = self._hists.get(key)
+        if h is None:
+            h = self._hists[key] = [[0] * len(self._buckets.get(name, LATENCY_BUCKETS)), 0.0, 0]
+        for i, bound in enumerate(self._buckets.get(name, LATENCY_BUCKETS)):
+            if value <= bound:
+                h[0][i] += 1
+        h[1] += value
+        h[2] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """
+        Observes the block's duration. Labels can be added inside the block
+        (e.g. the status code) by mutating the yielded dict.
+        """
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        for name, kind in self._types.items():
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            if name in self._gauge_fns:
+                try:
+                    lines.append(f"{name} {float(self._gauge_fns[name]())}")
+                except Exception:
+                    pass
+                continue
+            if kind == "histogram":
+                bounds = self._buckets[name]
+                for (n, labels), (counts, total, count) in self._hists.items():
+                    if n != name:
+                        continue
+                    for bound, c in zip(bounds, counts):
+                        lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {c}")
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{fmt(labels)} {total}")
+                    lines.append(f"{name}_count{fmt(labels)} {count}")
+            else:
+                for (n, labels), value in self._values.items():
+                    if n == name:
+                        lines.append(f"{name}{fmt(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("minehut_request_seconds", "histogram", "Minehut call latency including retries, by op and status")
+metrics.describe("minehut_requests_total", "counter", "Minehut calls by op and status")
+metrics.describe("minehut_retries_total", "counter", "Minehut attempts that were retried")
+metrics.describe("discord_request_seconds", "histogram", "Discord REST call latency by method and route")
+metrics.describe("command_seconds", "histogram", "Command handler duration by command and outcome")
+metrics.describe("commands_total", "counter", "Commands run by command and outcome")
+metrics.describe("status_edits_total", "counter", "Status/IP message edits by message and result (sent/skipped/error)")
+metrics.describe("minehut_transition_seconds", "histogram",
+                 "Time from a start/shutdown request to the expected state being observed", TRANSITION_BUCKETS)
+metrics.describe("minehut_transition_timeouts_total", "counter", "Transitions whose expected state was never observed")
+metrics.describe("minehut_transitions_superseded_total", "counter", "Transitions replaced by a newer one before completing")
+metrics.describe("status_polls_superseded_total", "counter", "Status reads dropped because a newer action was reported mid-read")
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class LoopWatchdog:
+    """
+    Event loop stall detector, opt-in with LOOP_WATCHDOG=1. A task on the
+    loop wakes every `interval` seconds and records how late it woke up (the
+    loop lag). A helper thread watches that heartbeat: when the loop hasn't
+    come back `threshold` seconds past its wake-up time, whatever the loop
+    thread is executing right now is what blocks it, so its stack is grabbed
+    and counted by call site. !perf shows the worst sites.
+    """
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.sites = Counter()  # call site -> stalls caught there
+        self.worst = {}         # call site -> longest stall seen there (seconds)
+        self._lock = threading.Lock()  # sites/worst are written by the watcher thread
+        self._beat = time.monotonic()
+        self._loop_thread = None
+        self._task = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        log.info("loop watchdog on: stalls over %.0f ms are traced", self.threshold * 1000)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop.set()
+
+    async def _tick(self):
+        while True:
+            started = time.monotonic()
+            self._beat = started
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, time.monotonic() - started - self.interval)
+            self.max_lag = max(self.max_lag, self.lag)
+            metrics.observe("event_loop_lag_seconds", self.lag)
+
+    def _watch(self):
+        caught = None  # heartbeat of the stall already traced
+        site = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold:
+                continue
+            if beat == caught:
+                # same stall still going, only its length changes
+                with self._lock:
+                    self.worst[site] = max(self.worst.get(site, 0.0), stalled)
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            caught = beat
+            stack = traceback.extract_stack(frame)
+            del frame
+            site = self._site(stack)
+            with self._lock:
+                self.stalls += 1
+                self.sites[site] += 1
+                self.worst[site] = max(self.worst.get(site, 0.0), stalled)
+            if self.sites[site] == 1:
+                log.warning("event loop blocked at %s:\n%s", site, "".join(traceback.format_list(stack[-8:])))
+
+    @staticmethod
+    def _site(stack):
+        # innermost frame of our own code, plus the library frame it's stuck in
+        leaf = stack[-1]
+        ours = next((f for f in reversed(stack) if f.filename.startswith(_SOURCE_DIR)), None)
+        where = lambda f: f"{os.path.basename(f.filename)}:{f.lineno} {f.name}"
+        if ours is None or ours is leaf:
+            return where(leaf)
+        return f"{where(ours)} -> {where(leaf)}"
+
+    def top(self, n: int = 5):
+        """[(site, stalls, longest seconds)], most frequent first"""
+        with self._lock:
+            return [(site, count, self.worst.get(site, 0.0)) for site, count in self.sites.most_common(n)]
+
+
+loop_watchdog = LoopWatchdog(threshold=LOOP_STALL_THRESHOLD)
+metrics.describe("event_loop_lag_seconds", "histogram", "How late the watchdog's heartbeat woke up", LAG_BUCKETS)
+metrics.gauge_fn("event_loop_stalls", "Loop stalls over the threshold caught by the watchdog",
+                 lambda: loop_watchdog.stalls)
+metrics.gauge_fn("asyncio_tasks", "Tasks alive on the event loop", lambda: len(asyncio.all_tasks()))
+
+class EventRecorder:
+    """
+    Opt-in (RECORD_FILE=path) log of what drives the bot: commands, stop
+    requests, reactions and every Minehut response, one JSON object per line
+    with "t" = seconds since the recording started. Lines are buffered and
+    appended from a thread, so recording costs a list append on the loop.
+    `python -m bench.replay` feeds a recording back through the bot against
+    local stubs. Contains user names/ids, treat the file accordingly.
+    """
+
+    def __init__(self, path: str = None, flush_delay: float = 1.0):
+        self.path = path or None
+        self.flush_delay = flush_delay
+        self._started = time.monotonic()
+        self._lines = []
+        self._flush_task = None
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def write(self, kind: str, **fields):
+        if self.path is None:
+            return
+        fields = {"t": round(time.monotonic() - self._started, 4), "kind": kind, **fields}
+        self._lines.append(json.dumps(fields, default=str, separators=(",", ":")))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    def start(self):
+        """header line: which servers the recorded Minehut paths belong to"""
+        self.write(
+            "start",
+            servers={n: s.id for n, s in SERVERS.items()},
+            active=CURRENT_SERVER_NUMBER,
+            status_channel=STATUS_CHANNEL_ID,
+        )
+
+    @staticmethod
+    def _user(user):
+        roles = getattr(user, "roles", None) or ()
+        return {
+            "id": user.id,
+            "name": str(user),
+            "roles": [[r.id, getattr(r, "name", None)] for r in roles if getattr(r, "id", None) is not None],
+        }
+
+    def command(self, ctx):
+        if self.path is None:
+            return
+        if ctx.interaction is not None:
+            # slash invocation, written down as the equivalent prefix command
+            args = " ".join(str(v) for _, v in ctx.interaction.namespace)
+            content = f"{ctx.prefix or '!'}{ctx.command.qualified_name} {args}".strip()
+        else:
+            content = ctx.message.content
+        self.write("command", content=content, channel=ctx.channel.id, user=self._user(ctx.author))
+
+    def reaction(self, payload):
+        if self.path is None or payload.member is None:
+            return
+        self.write("reaction", message_id=payload.message_id, emoji=str(payload.emoji), user=self._user(payload.member))
+
+    async def _flush_later(self):
+        while self._lines:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+
+    async def flush(self):
+        if not self._lines:
+            return
+        lines, self._lines = self._lines, []
+        try:
+            await asyncio.to_thread(self._append, lines)
+        except Exception as e:
+            log.error("recorder write error: %r", e)
+
+    def _append(self, lines):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+recorder = EventRecorder(RECORD_FILE)
+
+def _edit_fingerprint(fields: dict):
+    """
+    Comparable form of a message edit. The embed's "Last updated" line changes
+    on every render, so it's left out, otherwise no edit would ever be a no-op.
+    """
+    out = {}
+    for k, v in fields.items():
+        if isinstance(v, discord.Embed):
+            v = v.to_dict()
+            if "description" in v:
+                v["description"] = "\n".join(
+                    line for line in v["description"].split("\n") if not line.startswith("Last updated:")
+                )
+        out[k] = v
+    if _orjson is not None:
+        return _orjson.dumps(out, option=_orjson.OPT_SORT_KEYS, default=str)
+    return json.dumps(out, sort_keys=True, default=str)
+
+def _resolve_waiters(waiters, result=None, error: Exception = None):
+    for fut in waiters:
+        if fut.done():
+            continue
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+class EditScheduler:
+    """
+    Funnels edits of the bot's long-lived messages through one worker per
+    message:
+    - an edit whose rendered output matches the last one sent is skipped
+    - edits submitted while one is waiting collapse into the latest one
+    - edits are paced per channel with a RateBucket to stay under Discord's
+      edit bucket instead of running into 429s
+    """
+
+    def __init__(self, rate: int = DISCORD_EDIT_RATE, per: float = DISCORD_EDIT_PER):
+        self.rate = rate
+        self.per = per
+        self._buckets = {}  # channel_id -> RateBucket
+        self._last = {}     # key -> fingerprint of the last edit sent
+        self._pending = {}  # key -> [fingerprint, fields, apply, waiters]
+        self._workers = {}  # key -> task
+
+    def bucket(self, channel_id: int):
+        b = self._buckets.get(channel_id)
+        if b is None:
+            b = self._buckets[channel_id] = RateBucket(self.rate, self.per)
+        return b
+
+    def forget(self, key):
+        """drop the remembered fingerprint, e.g. after the message was recreated"""
+        self._last.pop(key, None)
+
+    def submit(self, key, channel_id: int, apply, **fields):
+        """
+        Queue `apply(**fields)`, a coroutine function that performs the edit.
+        Returns a future that completes once this edit, or a later one that
+        replaced it, has been applied or skipped.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        fp = _edit_fingerprint(fields)
+        pending = self._pending.get(key)
+        if pending is None:
+            if self._last.get(key) == fp:
+                metrics.inc("status_edits_total", message=key, result="skipped")
+                fut.set_result(False)
+                return fut
+            self._pending[key] = [fp, fields, apply, [fut]]
+        else:
+            # latest wins, everyone waiting gets the latest edit's outcome
+            pending[0], pending[1], pending[2] = fp, fields, apply
+            pending[3].append(fut)
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key, channel_id))
+        return fut
+
+    async def _drain(self, key, channel_id: int):
+        try:
+            while key in self._pending:
+                if self._pending[key][0] == self._last.get(key):
+                    _, _, _, waiters = self._pending.pop(key)
+                    metrics.inc("status_edits_total", message=key, result="skipped")
+                    _resolve_waiters(waiters, False)
+                    continue
+                # more submits can collapse into the pending edit while we wait
+                await self.bucket(channel_id).acquire()
+                fp, fields, apply, waiters = self._pending.pop(key)
+                if fp == self._last.get(key):
+                    metrics.inc("status_edits_total", message=key, result="skipped")
+                    _resolve_waiters(waiters, False)
+                    continue
+                try:
+                    await apply(**fields)
+                except Exception as e:
+                    self._last.pop(key, None)
+                    metrics.inc("status_edits_total", message=key, result="error")
+                    _resolve_waiters(waiters, error=e)
+                else:
+                    self._last[key] = fp
+                    metrics.inc("status_edits_total", message=key, result="sent")
+                    _resolve_waiters(waiters, True)
+        finally:
+            self._workers.pop(key, None)
+
+message_editor = EditScheduler()
 # basic checks early so you see clear errors
+def _atomic_write(path: str, text: str):
+    # write a sibling tmp file and rename over the target, so a crash mid-write
+    # leaves either the old file or the new one, never an empty one
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class StateStore:
+    """
+    In-memory copy of everything the bot persists (message ids, active server).
+    Loaded once at startup so reads never touch disk. set() marks the store
+    dirty and one write-behind task flushes every change made within
+    `flush_delay` seconds in a single atomic write off the event loop.
+    """
+
+    def __init__(self, path: str, legacy: dict = None, flush_delay: float = 1.0):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._data = {}
+        self._dirty = False
+        self._flush_task = None
+        self._load(legacy or {})
+
+    def _load(self, legacy: dict):
+        try:
+            with open(self.path, "rb") as f:
+                self._data = _json_loads(f.read())
+            return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log.warning("state file unreadable, starting empty: %r", e)
+            return
+
+        # first run on this layout: pull values in from the old side files
+        for key, (filename, field) in legacy.items():
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    value = json.load(f).get(field)
+            except Exception:
+                continue
+            if value is not None:
+                self._data[key] = value
+                self._dirty = True
+
+    def get(self, key: str, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key: str, value):
+        if self._data.get(key) == value and key in self._data:
+            return
+        self._data[key] = value
+        self._dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # no loop yet (import time), nothing to block
+            self.flush_sync()
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # loop so changes made during a write get their own flush
+        while self._dirty:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        text = _json_dumps(self._data)
+        self._dirty = False
+        try:
+            await asyncio.to_thread(_atomic_write, self.path, text)
+        except Exception as e:
+            self._dirty = True
+            log.error("state flush error: %r", e)
+
+    def flush_sync(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            _atomic_write(self.path, _json_dumps(self._data))
+        except Exception as e:
+            self._dirty = True
+            log.error("state flush error: %r", e)
+
+bot_state = StateStore(STATE_FILE, legacy={
+    "status_message_id": (STATUS_FILE, "message_id"),
+    "server_ip_message_id": (SERVER_IP_FILE, "message_id"),
+    "active_server_number": (ACTIVE_SERVER_FILE, "server_number"),
+})
+
 def _load_status_msg_id():
     try:
-        with open(STATUS_FILE, "r", encoding="utf-8") as f:
-            d = json.load(f)
-            return int(d.get("message_id"))
+        return int(bot_state.get("status_message_id"))
     except Exception:
         return None
 
 def _save_status_msg_id(msg_id: int):
-    with open(STATUS_FILE, "w", encoding="utf-8") as f:
-        json.dump({"message_id": int(msg_id)}, f)
+    bot_state.set("status_message_id", int(msg_id))
 
 def _load_server_ip_msg_id():
     try:
-        with open(SERVER_IP_FILE, "r", encoding="utf-8") as f:
-            d = json.load(f)
-            return int(d.get("message_id"))
+        return int(bot_state.get("server_ip_message_id"))
     except Exception:
         return None
 
 def _save_server_ip_msg_id(msg_id: int):
-    with open(SERVER_IP_FILE, "w", encoding="utf-8") as f:
-        json.dump({"message_id": int(msg_id)}, f)
+    bot_state.set("server_ip_message_id", int(msg_id))
 
 def _load_active_server_number():
-    try:
-        with open(ACTIVE_SERVER_FILE, "r", encoding="utf-8") as f:
-            d = json.load(f)
-            n = str(d.get("server_number"))
-            return n if n in {"1", "2"} else None
-    except Exception:
-        return None
+    n = str(bot_state.get("active_server_number"))
+    return n if n in SERVERS else None
 
 def _save_active_server_number(server_number: str):
-    with open(ACTIVE_SERVER_FILE, "w", encoding="utf-8") as f:
-        json.dump({"server_number": str(server_number)}, f)
+    bot_state.set("active_server_number", str(server_number))
+
+@dataclass(frozen=True)
+class ServerInfo:
+    number: str
+    id: str
+    ip: str
+    label: str
+
+# IPs of the original two servers, used when MINEHUT_SERVERIP<n> isn't set
+_DEFAULT_SERVER_IPS = {"1": "TheNinjaArmy.minehut.gg", "2": "NinjaArmy2.minehut.gg"}
+
+def _load_server_registry():
+    """
+    Builds the server list from .env: MINEHUT_SERVERID<n> (required),
+    MINEHUT_SERVERIP<n> and MINEHUT_SERVERLABEL<n> (optional), for n = 1, 2, ...
+    until the first missing id.
+    """
+    servers = {}
+    n = 1
+    while True:
+        server_id = os.getenv(f"MINEHUT_SERVERID{n}")
+        if not server_id:
+            break
+        number = str(n)
+        servers[number] = ServerInfo(
+            number=number,
+            id=server_id,
+            ip=os.getenv(f"MINEHUT_SERVERIP{n}") or _DEFAULT_SERVER_IPS.get(number, "Unknown"),
+            label=os.getenv(f"MINEHUT_SERVERLABEL{n}") or f"Server {n}",
+        )
+        n += 1
+    return servers
+
+SERVERS = _load_server_registry()  # server number -> ServerInfo
 
 def _get_server_id_from_number(server_number: str):
-    if str(server_number) == "2":
-        return os.getenv("MINEHUT_SERVERID2")
-    return os.getenv("MINEHUT_SERVERID1")
+    server = SERVERS.get(str(server_number))
+    return server.id if server else None
 
 def _extract_server_number_from_text(text: str):
     t = (text or "").lower()
-    if "ninjaarmy2.minehut.gg" in t or "server 2" in t:
-        return "2"
-    if "theninjaarmy.minehut.gg" in t or "server 1" in t:
-        return "1"
+    # IPs first, they are unambiguous
+    for number, server in SERVERS.items():
+        if server.ip.lower() in t:
+            return number
+    for number in SERVERS:
+        if re.search(rf"\bserver {number}\b", t):
+            return number
     return None
 
 def _format_server_ip_message(server_number: str):
-    if str(server_number) == "1":
-        ip = "TheNinjaArmy.minehut.gg"
-    elif str(server_number) == "2":
-        ip = "NinjaArmy2.minehut.gg"
-    else:
-        ip = "Unknown"
+    server = SERVERS.get(str(server_number))
+    ip = server.ip if server else "Unknown"
     return f"Current server IP: `{ip}` (server {server_number})"
 
-async def _ensure_server_ip_message(server_number: str):
-    channel = bot.get_channel(SERVER_IP_CHANNEL_ID) or await bot.fetch_channel(SERVER_IP_CHANNEL_ID)
-    if channel is None:
-        raise RuntimeError(f"cannot find channel {SERVER_IP_CHANNEL_ID}")
+_channels = {}  # channel id -> resolved channel, so fetch_channel runs at most once per id
 
-    msg_id = _load_server_ip_msg_id()
-    if msg_id:
-        try:
-            msg = await channel.fetch_message(msg_id)
-            return msg
-        except Exception:
-            pass
+async def _get_channel(channel_id: int):
+    channel = _channels.get(channel_id) or bot.get_channel(channel_id)
+    if channel is None:
+        channel = await bot.fetch_channel(channel_id)
+    if channel is None:
+        raise RuntimeError(f"cannot find channel {channel_id}")
+    _channels[channel_id] = channel
+    return channel
 
+async def _find_server_ip_message(channel):
     # Fallback: reuse an existing bot IP message if present.
     try:
         async for m in channel.history(limit=50):
@@ -103,20 +817,38 @@ async def _ensure_server_ip_message(server_number: str):
                 return m
     except Exception:
         pass
+    return None
 
-    msg = await channel.send(_format_server_ip_message(server_number))
+async def _edit_server_ip_message(**fields):
+    """
+    Edits the IP message by id through a partial message, no fetch. The
+    history scan / resend only happens when there is no id or the edit
+    fails with NotFound.
+    """
+    channel = await _get_channel(SERVER_IP_CHANNEL_ID)
+    msg_id = _load_server_ip_msg_id()
+    if msg_id:
+        try:
+            await channel.get_partial_message(msg_id).edit(**fields)
+            return
+        except discord.NotFound:
+            log.info("server ip message %s is gone, looking for another one", msg_id)
+
+    msg = await _find_server_ip_message(channel)
+    if msg is not None and msg.id != msg_id:
+        await msg.edit(**fields)
+        return
+
+    msg = await channel.send(**fields)
     _save_server_ip_msg_id(msg.id)
-    return msg
 
 async def _detect_server_number_from_ip_message():
     """
     Reads the tracked IP message (or recent bot IP message) and infers server number.
-    Returns "1"/"2"/None.
+    Returns a server number from SERVERS or None.
     """
     try:
-        channel = bot.get_channel(SERVER_IP_CHANNEL_ID) or await bot.fetch_channel(SERVER_IP_CHANNEL_ID)
-        if channel is None:
-            return None
+        channel = await _get_channel(SERVER_IP_CHANNEL_ID)
 
         msg_id = _load_server_ip_msg_id()
         if msg_id:
@@ -128,24 +860,125 @@ async def _detect_server_number_from_ip_message():
             except Exception:
                 pass
 
-        async for m in channel.history(limit=50):
-            if m.author.id == bot.user.id and m.content.startswith("Current server IP:"):
-                _save_server_ip_msg_id(m.id)
-                n = _extract_server_number_from_text(m.content)
-                if n:
-                    return n
-                break
+        m = await _find_server_ip_message(channel)
+        if m is not None:
+            return _extract_server_number_from_text(m.content)
     except Exception:
         return None
     return None
 
+_UNKNOWN_CHANNEL = 10003  # Discord JSON error code, vs 10008 Unknown Message
+
+class ChannelMirrors:
+    """
+    Extra channels (partner servers etc.) that get their own live copy of the
+    status embed and the IP message. Callers render once and publish(); each
+    copy goes through message_editor under its own key, so every channel has
+    its own worker and RateBucket and a slow or deleted channel only holds up
+    its own copy. At most `concurrency` mirror edits run at once. Channels
+    come from STATUS_MIRROR_CHANNELS plus the ones added with !mirror, the
+    id of each copy is kept in bot_state.
+    """
+
+    def __init__(self, store: StateStore, configured=(), concurrency: int = 5, key: str = "mirrors"):
+        self.store = store
+        self.key = key
+        self.configured = set(configured)
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+
+    def _data(self):
+        # str(channel_id) -> {"status": message id, "server_ip": message id}
+        return {k: dict(v) for k, v in (self.store.get(self.key) or {}).items()}
+
+    def channels(self):
+        return sorted(self.configured | {int(k) for k in self._data()})
+
+    def add(self, channel_id: int):
+        data = self._data()
+        data.setdefault(str(channel_id), {})
+        self.store.set(self.key, data)
+
+    def remove(self, channel_id: int):
+        data = self._data()
+        if data.pop(str(channel_id), None) is not None:
+            self.store.set(self.key, data)
+        self.configured.discard(channel_id)
+        message_editor.forget(f"status:{channel_id}")
+        message_editor.forget(f"server_ip:{channel_id}")
+
+    def _save_message_id(self, channel_id: int, kind: str, message_id: int):
+        data = self._data()
+        data.setdefault(str(channel_id), {})[kind] = message_id
+        self.store.set(self.key, data)
+
+    def publish(self, kind: str, **fields):
+        """queue `fields` ("status" or "server_ip" message) for every mirror, doesn't wait"""
+        for channel_id in self.channels():
+            fut = message_editor.submit(
+                f"{kind}:{channel_id}", channel_id, functools.partial(self._apply, channel_id, kind), **fields
+            )
+            fut.add_done_callback(self._done)
+
+    @staticmethod
+    def _done(fut):
+        if not fut.cancelled() and fut.exception() is not None:
+            log.warning("mirror update failed: %r", fut.exception())
+
+    def _drop(self, channel_id: int, error):
+        # channel deleted or we were kicked: stop mirroring there
+        log.info("mirror channel %s is gone (%r), removing it", channel_id, error)
+        self.remove(channel_id)
+        # the cached channel object would keep it resolving
+        _channels.pop(channel_id, None)
+
+    async def _apply(self, channel_id: int, kind: str, **fields):
+        async with self._slots:
+            try:
+                channel = await _get_channel(channel_id)
+            except (discord.NotFound, discord.Forbidden) as e:
+                self._drop(channel_id, e)
+                # raised so message_editor doesn't remember this edit as sent
+                raise
+            msg_id = (self._data().get(str(channel_id)) or {}).get(kind)
+            try:
+                if msg_id:
+                    try:
+                        await channel.get_partial_message(msg_id).edit(**fields)
+                        return
+                    except discord.NotFound as e:
+                        if e.code == _UNKNOWN_CHANNEL:
+                            raise
+                        log.info("mirror %s message %s in %s is gone, posting a new one", kind, msg_id, channel_id)
+                msg = await channel.send(**fields)
+            except (discord.NotFound, discord.Forbidden) as e:
+                self._drop(channel_id, e)
+                raise
+            self._save_message_id(channel_id, kind, msg.id)
+
+
+mirrors = ChannelMirrors(bot_state, STATUS_MIRROR_CHANNELS, concurrency=MIRROR_CONCURRENCY)
+
 async def update_server_ip_message(server_number: str):
-    async with _server_ip_lock:
-        try:
-            msg = await _ensure_server_ip_message(server_number)
-            await msg.edit(content=_format_server_ip_message(server_number))
-        except Exception as e:
-            print("update_server_ip_message error:", repr(e))
+    try:
+        content = _format_server_ip_message(server_number)
+        mirrors.publish("server_ip", content=content)
+        await message_editor.submit("server_ip", SERVER_IP_CHANNEL_ID, _edit_server_ip_message, content=content)
+    except Exception as e:
+        log.error("update_server_ip_message error: %r", e)
+
+# exact (lowercased) values Minehut uses, checked before the fuzzy fallback
+_STATE_LOOKUP = {
+    "running": "running",
+    "online": "running",
+    "started": "running",
+    "active": "running",
+    "stopped": "stopped",
+    "offline": "stopped",
+    "sleeping": "stopped",
+    "suspended": "stopped",
+    "hibernating": "stopped",
+    "shutdown": "stopped",
+}
 
 def _coerce_status_state(result):
     """
@@ -155,13 +988,15 @@ def _coerce_status_state(result):
     if isinstance(result, bool):
         return "running" if result else "stopped"
 
+    if isinstance(result, ServerSnapshot):
+        return result.state
+
     if isinstance(result, str):
         s = result.strip().lower()
         # direct values first
-        if s in {"running", "online", "started", "active"}:
-            return "running"
-        if s in {"stopped", "offline", "sleeping", "suspended"}:
-            return "stopped"
+        hit = _STATE_LOOKUP.get(s)
+        if hit is not None:
+            return hit
 
         # fuzzy fallback
         if "stop" in s or "shut" in s or "sleep" in s or "off" in s:
@@ -171,25 +1006,110 @@ def _coerce_status_state(result):
 
     return "unknown"
 
+def _first(d: dict, *keys):
+    for k in keys:
+        v = d.get(k)
+        if v is not None:
+            return v
+    return None
+
+class ServerSnapshot:
+    """
+    What we keep from one /server/{id} response. Parsed once from the raw
+    body; __slots__ keeps the cached copies small.
+    """
+
+    __slots__ = ("server_id", "state", "players", "max_players", "plan", "ram", "last_online", "fetched_at")
+
+    def __init__(self, server_id: str, state: str, players: int = None, max_players: int = None,
+                 plan: str = None, ram: int = None, last_online: float = None, fetched_at: float = None):
+        self.server_id = server_id
+        self.state = state
+        self.players = players
+        self.max_players = max_players
+        self.plan = plan
+        self.ram = ram
+        self.last_online = last_online  # unix seconds
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(**{k: d.get(k) for k in cls.__slots__})
+
+    def __repr__(self):
+        return f"<ServerSnapshot {self.server_id} {self.state} players={self.players}/{self.max_players}>"
+
+    @classmethod
+    def parse(cls, server_id: str, body: bytes):
+        data = _json_loads(body)
+        server = data.get("server", {}) or {}
+        return cls(
+            server_id,
+            _state_from_payload(data, server),
+            players=_first(server, "playerCount", "player_count"),
+            max_players=_first(server, "maxPlayers", "max_players"),
+            plan=_first(server, "server_plan", "activeServerPlan", "plan"),
+            ram=_first(server, "ram", "memory"),
+            last_online=_epoch_seconds(_first(server, "last_online", "lastOnline")),
+        )
+
+def _epoch_seconds(value):
+    # Minehut sends milliseconds since epoch
+    if not isinstance(value, (int, float)):
+        return None
+    return value / 1000 if value > 1e11 else float(value)
+
+def _state_from_payload(data: dict, server: dict):
+    # Most reliable signal: explicit online boolean.
+    online_value = server.get("online")
+    if isinstance(online_value, bool):
+        normalized = _coerce_status_state(online_value)
+        log.debug("minehut parsed state: %s | raw online: %r", normalized, online_value)
+        return normalized
+
+    # Prefer explicit lifecycle/status text when available.
+    candidates = [
+        server.get("state"),
+        server.get("status"),
+        server.get("lifecycle_state"),
+        data.get("state"),
+        data.get("status"),
+    ]
+    for c in candidates:
+        normalized = _coerce_status_state(c)
+        if normalized != "unknown":
+            log.debug("minehut parsed state: %s | raw: %r", normalized, c)
+            return normalized
+
+    normalized = "stopped"
+    log.debug("minehut parsed state: %s | raw fallback (no online/state)", normalized)
+    return normalized
+
 # load last selected server (defaults to 1)
 
 CURRENT_SERVER_NUMBER = _load_active_server_number() or "1"
 SERVER_ID = _get_server_id_from_number(CURRENT_SERVER_NUMBER) or os.getenv("MINEHUT_SERVERID1")
 
-def _format_status_embed(state: str, last_action: str = None, by: str = None):
+_STATE_EMOJI = {
+    "running": "\U0001F7E2",
+    "stopped": "\U0001F534",
+    "unknown": "\u26AA",
+}
+
+def _format_status_embed(state: str, last_action: str = None, by: str = None, snapshot: "ServerSnapshot" = None):
     """
     Returns (content, embed) where:
     - content is short text (here None)
     - embed is a Discord Embed showing server status
     state: "running", "stopped", "unknown"
+    snapshot: optional ServerSnapshot for player count / plan / last online
     """
     now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
 
-    emoji = {
-        "running": "\U0001F7E2",
-        "stopped": "\U0001F534",
-        "unknown": "\u26AA"
-    }.get(state.lower(), "\u26AA")
+    emoji = _STATE_EMOJI.get(state.lower(), _STATE_EMOJI["unknown"])
 
     title = f"{emoji} Server Status: {state.capitalize()}"
 
@@ -198,6 +1118,8 @@ def _format_status_embed(state: str, last_action: str = None, by: str = None):
         desc += f"\nLast action: {last_action}"
     if by:
         desc += f" by {by}"
+    if snapshot is not None:
+        desc += _format_snapshot_details(snapshot, state)
 
     embed = discord.Embed(title=title, description=desc, color={
         "running": discord.Color.green(),
@@ -209,46 +1131,337 @@ def _format_status_embed(state: str, last_action: str = None, by: str = None):
 
     return None, embed
 
-async def _ensure_status_message():
+def _format_snapshot_details(snapshot: "ServerSnapshot", state: str = None):
+    lines = ""
+    if (state or snapshot.state) == "running" and snapshot.players is not None:
+        cap = f"/{snapshot.max_players}" if snapshot.max_players else ""
+        lines += f"\nPlayers: {snapshot.players}{cap}"
+    if snapshot.plan:
+        plan = str(snapshot.plan)
+        if snapshot.ram:
+            plan += f" ({snapshot.ram} MB)"
+        lines += f"\nPlan: {plan}"
+    if (state or snapshot.state) != "running" and snapshot.last_online:
+        lines += f"\nLast online: <t:{int(snapshot.last_online)}:R>"
+    return lines
+
+async def _edit_status_message(**fields):
     """
-    ensure a single status message exists in channel, return discord.Message
+    Edits the status message by id through a partial message, no fetch.
+    A new message is only posted when there is no id yet or the edit fails
+    with NotFound (message deleted).
     """
-    channel = bot.get_channel(STATUS_CHANNEL_ID) or await bot.fetch_channel(STATUS_CHANNEL_ID)
-    if channel is None:
-        raise RuntimeError(f"cannot find channel {STATUS_CHANNEL_ID}")
-
+    channel = await _get_channel(STATUS_CHANNEL_ID)
     msg_id = _load_status_msg_id()
     if msg_id:
         try:
-            msg = await channel.fetch_message(msg_id)
-            return msg
-        except Exception:
-            # message deleted or invalid -> recreate
-            pass
+            await channel.get_partial_message(msg_id).edit(**fields)
+            return
+        except discord.NotFound:
+            # message deleted -> recreate
+            log.info("status message %s is gone, posting a new one", msg_id)
 
-    # create a new message and save id
-    content, embed = _format_status_embed("unknown", "initializing", bot.user.name)
-    msg = await channel.send(content=content, embed=embed)
+    msg = await channel.send(**fields)
     _save_status_msg_id(msg.id)
-    return msg
 
-async def update_status_message(state: str, last_action: str=None, by: str=None):
+def _log_edit_error(fut):
+    if not fut.cancelled() and fut.exception() is not None:
+        log.error("update_status_message error: %r", fut.exception())
+
+async def update_status_message(state: str, last_action: str=None, by: str=None, snapshot: "ServerSnapshot" = None,
+                                wait: bool = True):
     """
     call this to update the status message.
     state: running/stopped/unknown
     last_action: e.g. "start requested"
     by: username or mention who triggered it
+    snapshot: latest ServerSnapshot, adds players/plan to the embed
+    wait: False returns once the edit is queued instead of sent
     """
-    async with _status_lock:
-        try:
-            msg = await _ensure_status_message()
-            content, embed = _format_status_embed(state, last_action, by)
-            # edit embed (and keep content None so it looks clean)
-            await msg.edit(content=content, embed=embed)
-        except Exception as e:
-            print("update_status_message error:", repr(e))
+    try:
+        content, embed = _format_status_embed(state, last_action, by, snapshot)
+        # rendered once, the mirrors get the same content/embed
+        mirrors.publish("status", content=content, embed=embed)
+        # edit embed (and keep content None so it looks clean)
+        fut = message_editor.submit("status", STATUS_CHANNEL_ID, _edit_status_message, content=content, embed=embed)
+        if not wait:
+            fut.add_done_callback(_log_edit_error)
+            return
+        await fut
+    except Exception as e:
+        log.error("update_status_message error: %r", e)
+
+class StatusPoller:
+    """
+    Background task that keeps the status embed current for one server.
+    Polls every `fast` seconds while a start/shutdown is in progress and backs
+    off towards `slow` once the state is stable. Commands don't poll
+    themselves, they call expect()/poke() and return.
+
+    Every command-driven update bumps `generation`; a read that was already
+    in flight when that happened is dropped when it returns, so it can't
+    overwrite the newer state (e.g. a pre-shutdown "running" read landing
+    after !stopserver).
+    """
+
+    def __init__(self, server_id: str, fast: float = STATUS_POLL_FAST, slow: float = STATUS_POLL_SLOW):
+        self.server_id = server_id
+        self.fast = fast
+        self.slow = slow
+        self.interval = fast      # poll interval used while a transition is pending
+        self.state = None         # last state pushed to the embed
+        self.snapshot = None      # last ServerSnapshot seen
+        self._restore = None      # (state, last_action, by) seeded, put back if the first poll confirms it
+        self._published = None    # (state, last_action, by, players) of the last push
+        self.published_at = None  # unix time of the last push
+        self.last_action = None
+        self.by = None
+        self.expected = None      # state a start/shutdown should end in
+        self.expected_since = 0.0
+        self.deadline = 0.0
+        self._stable_polls = 0
+        self.generation = 0       # bumped by supersede(), polls from older generations are dropped
+        self._schedule_seq = 0    # bumped by _schedule(), so a finished poll doesn't overwrite a newer schedule
+        self._next_poll = 0.0
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _schedule(self, delay: float):
+        self._next_poll = time.monotonic() + max(0.0, delay)
+        self._schedule_seq += 1
+        self._wake.set()
+
+    def hurry(self, within: float):
+        """make sure the next poll is at most `within` seconds away, never later than planned"""
+        self._stable_polls = 0
+        if self._next_poll > time.monotonic() + within:
+            self._schedule(within)
+
+    def supersede(self):
+        """
+        Called before a command reports a power action: any read already in
+        flight may predate it, so its result is thrown away.
+        """
+        self.generation += 1
+
+    def drop_transition(self):
+        """forget the transition being waited for (e.g. the server was switched to and re-read)"""
+        if self.expected is not None:
+            metrics.inc("minehut_transitions_superseded_total", to=self.expected)
+            self.expected = None
+            self.supersede()
+
+    def activate(self):
+        """
+        The server was switched (back) to: the embed shows another server, so
+        the next publish() must edit it even if this poller's state is unchanged.
+        """
+        self._published = None
+
+    def idle(self):
+        """True once a server that no longer owns the embed has nothing left to watch"""
+        return self.server_id != SERVER_ID and self.expected is None and not notifier.waiting(self.server_id)
+
+    def expect(self, state: str, last_action: str = None, by: str = None,
+               timeout: float = 45, delay: float = 3, interval: float = None):
+        """
+        Signal that a transition to `state` is underway: poll fast until it is
+        observed or `timeout` seconds pass. Replaces any transition still
+        being waited for.
+        """
+        if self.expected is not None:
+            metrics.inc("minehut_transitions_superseded_total", to=self.expected)
+        self.supersede()
+        self.expected = state.lower()
+        self.expected_since = time.monotonic()
+        self.deadline = self.expected_since + timeout
+        self.interval = max(1.0, interval or self.fast)
+        self.last_action = last_action
+        self.by = by
+        self._stable_polls = 0
+        self._schedule(delay)
+
+    def poke(self, last_action: str = None, by: str = None, delay: float = 0):
+        """
+        Ask for a poll soon without expecting any particular state.
+        """
+        if last_action is not None:
+            self.last_action = last_action
+            self.by = by
+        self._stable_polls = 0
+        self._schedule(delay)
+
+    def seed(self, state: str, snapshot: "ServerSnapshot", last_action: str = None, by: str = None):
+        """
+        Start from a persisted state (stale-while-revalidate): publish()
+        shows it marked as refreshing until the first successful poll.
+        """
+        self.snapshot = snapshot
+        self._restore = (state.lower(), last_action, by)
+        self.last_action = "Last known state, refreshing..."
+        self.by = None
+
+    async def publish(self, state: str, last_action: str = None, by: str = None, force: bool = False,
+                      wait: bool = True):
+        state = state.lower()
+        if last_action is not None:
+            self.last_action = last_action
+            self.by = by
+            # a command's update replaces the seeded state, nothing left to revalidate
+            self._restore = None
+        self.state = state
+        players = self.snapshot.players if self.snapshot is not None else None
+        published = (state, self.last_action, self.by, players)
+        if published == self._published and not force:
+            return
+        self._published = published
+        self.published_at = time.time()
+        if self._restore is None:
+            _save_last_status(self.server_id, state, self.snapshot, self.last_action, self.by)
+        # only the active server owns the status embed
+        if self.server_id == SERVER_ID:
+            await update_status_message(state, last_action=self.last_action, by=self.by, snapshot=self.snapshot,
+                                        wait=wait)
+
+    def _next_interval(self):
+        if self.expected is not None:
+            return self.interval
+        # stable: double the interval each quiet poll, up to `slow`
+        interval = min(self.slow, self.fast * (2 ** self._stable_polls))
+        if notifier.waiting(self.server_id):
+            # someone asked to be told when it changes, don't back off as far
+            interval = min(interval, NOTIFY_POLL_INTERVAL)
+        return interval
+
+    async def _poll_once(self):
+        # transition polls bypass the cache, it would hide the change for a TTL
+        generation = self.generation
+        snapshot = await get_minehut_snapshot(self.server_id, fresh=self.expected is not None)
+        if generation != self.generation:
+            # a newer action was reported while this read was in flight
+            metrics.inc("status_polls_superseded_total")
+            return
+        if snapshot is not None:
+            self.snapshot = snapshot
+            if self._restore is not None:
+                # seeded state revalidated, drop the "refreshing" marker; the
+                # saved last action only still applies if the state held
+                seeded, last_action, by = self._restore
+                self._restore = None
+                state = _coerce_status_state(snapshot)
+                if state == seeded:
+                    self.last_action, self.by = last_action, by
+                else:
+                    self.last_action, self.by = "Status changed", None
+                await self.publish(state, force=True)
+        current = _coerce_status_state(snapshot)
+
+        if self.expected is not None:
+            if current == self.expected:
+                self.expected = None
+                took = time.monotonic() - self.expected_since
+                metrics.observe("minehut_transition_seconds", took, to=current)
+                power.record_transition(current, took)
+                history.record_transition(self.server_id, current, took)
+                await self.publish(current)
+            elif time.monotonic() >= self.deadline:
+                # never observed the expected state: keep showing it rather
+                # than flipping to unknown, the slow polls will correct it
+                expected, self.expected = self.expected, None
+                metrics.inc("minehut_transition_timeouts_total", to=expected)
+                history.record_transition(self.server_id, expected, time.monotonic() - self.expected_since, timed_out=True)
+                await self.publish(expected)
+            return
+
+        if current != self.state:
+            self._stable_polls = 0
+            if self.state is not None and self.last_action is None:
+                self.last_action = "Status changed"
+            await self.publish(current)
+        else:
+            self._stable_polls += 1
+            # same state, but the player count may have moved (no-op otherwise)
+            await self.publish(current)
+
+    async def _run(self):
+        while True:
+            wait = self._next_poll - time.monotonic()
+            if wait > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            seq = self._schedule_seq
+            try:
+                await self._poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("status poller error: %r", e)
+            if self.idle():
+                # switched away from while a start/shutdown was pending, that's done now
+                if _pollers.get(self.server_id) is self:
+                    del _pollers[self.server_id]
+                self._task = None
+                return
+            if seq == self._schedule_seq:
+                self._next_poll = time.monotonic() + self._next_interval()
+
+
+_pollers = {}  # server_id -> StatusPoller
+
+def _save_last_status(server_id: str, state: str, snapshot: "ServerSnapshot", last_action: str, by: str):
+    # goes through the write-behind StateStore, only called when the embed changes
+    saved = dict(bot_state.get("last_status") or {})
+    saved[server_id] = {
+        "state": state,
+        "snapshot": snapshot.to_dict() if snapshot is not None else None,
+        "last_action": last_action,
+        "by": by,
+    }
+    bot_state.set("last_status", saved)
+
+def _load_last_status(server_id: str):
+    """(state, ServerSnapshot or None, last_action, by) persisted for server_id, or None"""
+    saved = (bot_state.get("last_status") or {}).get(server_id)
+    if not saved or not saved.get("state"):
+        return None
+    snapshot = ServerSnapshot.from_dict(saved["snapshot"]) if saved.get("snapshot") else None
+    return saved["state"], snapshot, saved.get("last_action"), saved.get("by")
+
+metrics.gauge_fn("status_pollers", "Running background status pollers", lambda: len(_pollers))
+metrics.gauge_fn("status_transitions_in_flight", "Start/shutdown transitions still being polled for",
+                 lambda: sum(1 for p in _pollers.values() if p.expected is not None))
+
+def track_server(server_id: str = None):
+    """
+    Returns the running poller for server_id (default: active server),
+    starting one if needed.
+    """
+    server_id = server_id or SERVER_ID
+    poller = _pollers.get(server_id)
+    if poller is None:
+        poller = StatusPoller(server_id)
+        _pollers[server_id] = poller
+    poller.start()
+    return poller
+
+def untrack_server(server_id: str):
+    poller = _pollers.pop(server_id, None)
+    if poller is not None:
+        poller.stop()
 
-# Override with transition-aware polling so start/stop states do not get flipped by short API lag.
 async def refresh_and_update(
     trigger_by: str = None,
     action_hint: str = None,
@@ -257,55 +1470,40 @@ async def refresh_and_update(
     expected_final: str = None,
     timeout_seconds: int = None,
     poll_interval: int = 3,
+    server_id: str = None,
 ):
-    if immediate_state:
-        await update_status_message(immediate_state, last_action=action_hint, by=trigger_by)
-
-    if poll_interval < 1:
-        poll_interval = 1
-    if timeout_seconds is None:
-        timeout_seconds = wait_seconds
-    if timeout_seconds < 0:
-        timeout_seconds = 0
-
+    """
+    Pushes immediate_state (if given) and hands follow-up polling to
+    server_id's StatusPoller (default: the active server). Returns as soon as
+    the embed edit is queued, the poller keeps watching for expected_final in
+    the background. A newer call replaces whatever transition the poller was
+    still waiting for. Pass the server a command acted on, SERVER_ID may have
+    been switched while its request was in flight.
+    """
+    server_id = server_id or SERVER_ID
+    poller = track_server(server_id)
     try:
-        elapsed = 0
-        expected = expected_final.lower() if expected_final else None
-        last_seen = None
-
-        while True:
-            if elapsed > 0:
-                await asyncio.sleep(poll_interval)
-            elif wait_seconds > 0:
-                await asyncio.sleep(wait_seconds)
-
-            real = await get_minehut_status()
-            current = _coerce_status_state(real)
-
-            last_seen = current
-
-            if expected is None:
-                await update_status_message(current, last_action=action_hint, by=trigger_by)
-                return
-
-            if current == expected:
-                await update_status_message(current, last_action=action_hint, by=trigger_by)
-                return
-
-            elapsed += poll_interval
-            if elapsed >= timeout_seconds:
-                # If we expected a specific final state but never reached it,
-                # keep the expected final instead of flipping to unknown.
-                if expected is not None and last_seen != expected:
-                    await update_status_message(expected, last_action=action_hint, by=trigger_by)
-                elif last_seen in {"running", "stopped"}:
-                    await update_status_message(last_seen, last_action=action_hint, by=trigger_by)
-                else:
-                    await update_status_message("unknown", last_action=action_hint, by=trigger_by)
-                return
+        if immediate_state:
+            # newer than anything the poller is reading right now
+            poller.supersede()
+            await poller.publish(immediate_state, last_action=action_hint, by=trigger_by, wait=False)
+        if expected_final:
+            if timeout_seconds is None:
+                timeout_seconds = wait_seconds
+            poller.expect(
+                expected_final,
+                last_action=action_hint,
+                by=trigger_by,
+                timeout=max(0, timeout_seconds),
+                delay=wait_seconds,
+                interval=poll_interval,
+            )
+        else:
+            poller.poke(last_action=action_hint, by=trigger_by, delay=wait_seconds)
     except Exception as e:
-        print("refresh_and_update error:", repr(e))
-        await update_status_message("unknown", last_action="refresh failed", by=trigger_by)
+        log.error("refresh_and_update error: %r", e)
+        if server_id == SERVER_ID:
+            await update_status_message("unknown", last_action="refresh failed", by=trigger_by)
 if not token:
     raise RuntimeError("DISCORD_TOKEN is missing from .env")
 if not SERVER_ID:
@@ -317,100 +1515,1025 @@ if not MINEHUT_TOKEN:
 if not MINEHUT_TOKEN.startswith("Bearer "):
     MINEHUT_TOKEN = "Bearer " + MINEHUT_TOKEN
 
-handler = logging.FileHandler(filename="discord.log", encoding="utf-8", mode="w")
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
+class MinehutUnavailable(Exception):
+    """raised instead of calling Minehut while the circuit breaker is open"""
+
 
-bot = commands.Bot(command_prefix="!", intents=intents)
-async def get_minehut_status():
-    url = f"https://api.minehut.com/server/{SERVER_ID}"
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed calls. While open every call is
+    refused for `cooldown` seconds, after that a single probe call is let
+    through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.cooldown or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            if self.opened_at is None:
+                log.warning("minehut circuit opened after %d failures", self.failures)
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+# statuses worth retrying: rate limited or Minehut having a bad moment
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class MinehutClient:
+    """
+    One long-lived aiohttp session shared by every Minehut call.
+    The connector keeps connections alive and caches DNS, so a status poll
+    is a single request round trip instead of DNS + TCP + TLS every time.
+    Outbound calls go through a token bucket, retryable failures are retried
+    with backoff, and a circuit breaker stops calls while Minehut is down.
+    """
+
+    def __init__(self, token: str, base_url: str = MINEHUT_API_BASE, limit: int = 10,
+                 dns_ttl: int = 300, keepalive: float = 60, timeout: float = 10,
+                 rate: int = MINEHUT_RATE, rate_per: float = MINEHUT_RATE_PER, retries: int = 2,
+                 backoff: float = 0.5, max_backoff: float = 10):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "authorization": token,
+            "accept": "application/json",
+            "content-type": "application/json",
+            "origin": "https://app.minehut.com",
+            "referer": "https://app.minehut.com/",
+            "user-agent": "Mozilla/5.0",
+        }
+        self.limit = limit
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = RateBucket(rate, rate_per)
+        self.breaker = CircuitBreaker()
+        self.pending = 0   # request() calls not finished yet (incl. rate limit waits and backoff)
+        self.inflight = 0  # HTTP requests on the wire right now
+        self._session = None
+
+    def _ensure_session(self):
+        # created lazily so the session binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive,
+                # None = aiohttp's default threaded resolver
+                resolver=aiohttp.AsyncResolver() if ACCELERATORS["aiodns"] else None,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def _retry_delay(self, attempt: int, retry_after: str = None):
+        if retry_after:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    async def request(self, method: str, path: str, retries: int = None, idempotent: bool = True, **kwargs):
+        """
+        Returns (status, raw body bytes). 429/5xx responses and connection errors
+        are retried up to `retries` times; the last failure is returned (or
+        raised) as-is. Timeouts are never retried: a hung Minehut would cost
+        a full timeout per attempt, so one counts as a breaker failure right
+        away. Raises MinehutUnavailable right away while the breaker is open.
+
+        idempotent=False (power actions) only retries a 429/503 that came
+        with Retry-After: after a timeout, disconnect or other 5xx the action
+        may already have been applied, and repeating it isn't safe.
+        """
+        if retries is None:
+            retries = self.retries
+        if not self.breaker.allow():
+            raise MinehutUnavailable("minehut circuit open")
+
+        self.pending += 1
+        try:
+            return await self._request(method, path, retries, idempotent, **kwargs)
+        finally:
+            self.pending -= 1
+
+    async def _request(self, method: str, path: str, retries: int, idempotent: bool, **kwargs):
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            error = None
+            status = body = retry_after = None
+            self.inflight += 1
+            sent = time.monotonic()
+            try:
+                async with self._ensure_session().request(method, self.base_url + path, **kwargs) as resp:
+                    status = resp.status
+                    body = await resp.read()
+                    retry_after = resp.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            finally:
+                self.inflight -= 1
+            if recorder.enabled:
+                recorder.write(
+                    "minehut", method=method, path=path, status=status, latency=round(time.monotonic() - sent, 4),
+                    body=body.decode("utf-8", "replace") if body is not None else None,
+                    retry_after=retry_after, error=repr(error) if error is not None else None,
+                )
+
+            if error is None and status not in RETRYABLE_STATUSES:
+                self.breaker.record_success()
+                return status, body
+            if isinstance(error, asyncio.TimeoutError):
+                retryable = False
+            else:
+                retryable = idempotent or (status in (429, 503) and retry_after)
+            if attempt >= retries or not retryable:
+                self.breaker.record_failure()
+                if error is not None:
+                    raise error
+                return status, body
+
+            delay = self._retry_delay(attempt, retry_after)
+            metrics.inc("minehut_retries_total", method=method)
+            log.info("minehut %s %s failed (%s), retrying in %.1fs", method, path, status or repr(error), delay)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+minehut = MinehutClient(MINEHUT_TOKEN)
+
+
+class StatusCache:
+    """
+    Per-server cache for status reads with in-flight coalescing.
+    Callers asking for the same server while a request is running all await
+    that one request instead of sending their own. invalidate() bumps the
+    server's epoch: a request started before that still answers its callers
+    but isn't cached or observed, so it can't overwrite a post-action read.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values = {}    # server_id -> (monotonic time, state)
+        self._inflight = {}  # server_id -> task
+        self._epochs = {}    # server_id -> bumped by invalidate()
+
+    def get(self, server_id, max_age: float = None):
+        hit = self._values.get(server_id)
+        if hit is None:
+            return None
+        ts, value = hit
+        if time.monotonic() - ts > (self.ttl if max_age is None else max_age):
+            return None
+        return value
+
+    def put(self, server_id, value):
+        self._values[server_id] = (time.monotonic(), value)
+
+    def last(self, server_id):
+        """last value seen for server_id, however old"""
+        hit = self._values.get(server_id)
+        return hit[1] if hit else None
+
+    def invalidate(self, server_id):
+        self._values.pop(server_id, None)
+        self._epochs[server_id] = self._epochs.get(server_id, 0) + 1
+
+    async def _load(self, server_id, loader, epoch, observe):
+        value = await loader(server_id)
+        # failures are not cached so the next caller retries
+        if value is not None and epoch == self._epochs.get(server_id, 0):
+            self.put(server_id, value)
+            if observe is not None:
+                observe(server_id, value)
+        return value
+
+    def _forget(self, server_id, task):
+        if self._inflight.get(server_id) is task:
+            del self._inflight[server_id]
+
+    async def fetch(self, server_id, loader, fresh: bool = False, observe=None):
+        """
+        fresh=True skips both the cached value and any request already in
+        flight (it may have started before a power action), but later callers
+        still coalesce onto the new request. observe(server_id, value) is
+        called for every loaded value that is still current.
+        """
+        if not fresh:
+            cached = self.get(server_id)
+            if cached is not None:
+                return cached
+            task = self._inflight.get(server_id)
+            if task is not None:
+                return await asyncio.shield(task)
+
+        epoch = self._epochs.get(server_id, 0)
+        task = asyncio.ensure_future(self._load(server_id, loader, epoch, observe))
+        self._inflight[server_id] = task
+        task.add_done_callback(lambda t: self._forget(server_id, t))
+        # shield so one cancelled caller doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+
+status_cache = StatusCache(MINEHUT_STATUS_TTL)
+
+_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    server_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    started REAL NOT NULL,
+    ended REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    peak_players INTEGER,
+    cause TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_server ON runs (server_id, started);
+CREATE TABLE IF NOT EXISTS power_events (
+    server_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    action TEXT NOT NULL,
+    status INTEGER
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    server_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    target TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    timed_out INTEGER NOT NULL
+);
+"""
+
+class StateRun:
+    """one stretch of the same observed state, a row in `runs`"""
+
+    __slots__ = ("id", "server_id", "state", "started", "ended", "samples", "peak_players", "cause")
+
+    def __init__(self, server_id: str, state: str, started: float, ended: float = None, samples: int = 1,
+                 peak_players: int = None, cause: str = None, id: int = None):
+        self.id = id
+        self.server_id = server_id
+        self.state = state
+        self.started = started
+        self.ended = started if ended is None else ended
+        self.samples = samples
+        self.peak_players = peak_players
+        self.cause = cause  # how it began: start / shutdown / unexpected / observed
+
+    def row(self):
+        return (self.server_id, self.state, self.started, self.ended, self.samples, self.peak_players, self.cause)
+
+
+class StatusHistory:
+    """
+    Time series of observed states and power actions behind !uptime and
+    !history. Observations are run-length encoded: a poll that sees the same
+    state only extends the current run, so months of polling stay a few rows
+    per start/stop. The newest `ring` runs and transitions per server live in
+    memory and answer every query; sqlite is only written, in write-behind
+    batches off the event loop, and read once at startup. Rows older than
+    `retention` seconds are pruned.
+    """
+
+    POWER_WINDOW = 600  # a state change this soon after a matching power call is attributed to it
+
+    def __init__(self, path: str, retention: float, ring: int = 500, max_gap: float = 600, flush_delay: float = 5.0):
+        self.path = path
+        self.retention = retention
+        self.ring = ring
+        self.max_gap = max_gap  # longest silence a run is assumed to continue through
+        self.flush_delay = flush_delay
+        self._runs = {}         # server_id -> deque of StateRun, newest (current) last
+        self._transitions = {}  # server_id -> deque of (ts, target, seconds, timed_out)
+        self._power = {}        # server_id -> (ts, action, status) of the last power call
+        self._dirty = set()     # runs changed since the last flush
+        self._pending = []      # (sql, params) inserts waiting for the next flush
+        self._flush_task = None
+        self._pruned_at = 0.0
+        self._lock = threading.Lock()  # one writer thread at a time on the shared connection
+        self._db = None
+        try:
+            self._open()
+        except Exception as e:
+            # history is nice to have: keep the in-memory part running without a file
+            log.warning("status history db unavailable, keeping it in memory only: %r", e)
+            self._db = None
+
+    def _open(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_HISTORY_SCHEMA)
+        servers = [r[0] for r in self._db.execute("SELECT DISTINCT server_id FROM runs")]
+        for server_id in servers:
+            rows = self._db.execute(
+                "SELECT id, server_id, state, started, ended, samples, peak_players, cause FROM runs"
+                " WHERE server_id = ? ORDER BY started DESC LIMIT ?",
+                (server_id, self.ring),
+            ).fetchall()
+            runs = self._series(server_id, self._runs)
+            for r in reversed(rows):
+                runs.append(StateRun(r[1], r[2], r[3], r[4], r[5], r[6], r[7], id=r[0]))
+        for server_id, ts, target, seconds, timed_out in self._db.execute(
+            "SELECT server_id, ts, target, seconds, timed_out FROM transitions ORDER BY ts"
+        ):
+            self._series(server_id, self._transitions).append((ts, target, seconds, bool(timed_out)))
+        for server_id, ts, action, status in self._db.execute(
+            "SELECT server_id, MAX(ts), action, status FROM power_events GROUP BY server_id"
+        ):
+            self._power[server_id] = (ts, action, status)
+
+    def _series(self, server_id: str, table: dict):
+        series = table.get(server_id)
+        if series is None:
+            series = table[server_id] = deque(maxlen=self.ring)
+        return series
+
+    # recording
+
+    def observe(self, server_id: str, state: str, players: int = None, now: float = None):
+        if state not in ("running", "stopped"):
+            return
+        now = time.time() if now is None else now
+        runs = self._series(server_id, self._runs)
+        current = runs[-1] if runs else None
+        if current is not None and current.state == state and now - current.ended <= self.max_gap:
+            current.ended = max(current.ended, now)
+            current.samples += 1
+        else:
+            if current is not None and current.state == state:
+                # same state after a silence (bot offline): unknown what happened in between
+                cause = "observed"
+            else:
+                cause = self._cause(server_id, current, state, now)
+            current = StateRun(server_id, state, now, cause=cause)
+            runs.append(current)
+        if players is not None:
+            current.peak_players = max(current.peak_players or 0, players)
+        self._dirty.add(current)
+        self._schedule_flush()
+
+    def _cause(self, server_id: str, previous: StateRun, state: str, now: float):
+        if previous is None:
+            return "observed"
+        ts, action, status = self._power.get(server_id) or (0.0, None, None)
+        recent = status == 200 and now - ts <= self.POWER_WINDOW
+        if state == "running":
+            return "start" if recent and action == "start_service" else "observed"
+        return "shutdown" if recent and action == "shutdown" else "unexpected"
+
+    def record_power(self, server_id: str, action: str, status: int = None):
+        now = time.time()
+        self._power[server_id] = (now, action, status)
+        self._pending.append(("INSERT INTO power_events VALUES (?, ?, ?, ?)", (server_id, now, action, status)))
+        self._schedule_flush()
+
+    def record_transition(self, server_id: str, target: str, seconds: float, timed_out: bool = False):
+        now = time.time()
+        self._series(server_id, self._transitions).append((now, target, seconds, timed_out))
+        self._pending.append((
+            "INSERT INTO transitions VALUES (?, ?, ?, ?, ?)",
+            (server_id, now, target, seconds, int(timed_out)),
+        ))
+        self._schedule_flush()
+
+    # queries, memory only
+
+    def current(self, server_id: str):
+        runs = self._runs.get(server_id)
+        return runs[-1] if runs else None
+
+    def runs(self, server_id: str, limit: int = 10, now: float = None):
+        """(StateRun, seconds it lasted) pairs, newest first"""
+        now = time.time() if now is None else now
+        spans = list(self._spans(server_id, now))
+        return [(run, end - start) for run, start, end in reversed(spans[-limit:])]
+
+    def _spans(self, server_id: str, now: float):
+        # a run lasts until the next one starts (or now), unless nothing was
+        # observed for longer than max_gap, e.g. while the bot was offline
+        runs = list(self._runs.get(server_id) or ())
+        for i, run in enumerate(runs):
+            end = runs[i + 1].started if i + 1 < len(runs) else now
+            if end - run.ended > self.max_gap:
+                end = run.ended
+            yield run, run.started, end
+
+    def since(self, server_id: str, now: float = None):
+        """(state, seconds) of the current run, or None"""
+        now = time.time() if now is None else now
+        spans = list(self._spans(server_id, now))
+        if not spans:
+            return None
+        run, start, end = spans[-1]
+        return run.state, end - start
+
+    def uptime(self, server_id: str, window: float, now: float = None):
+        """
+        (running fraction, observed seconds) over the last `window` seconds;
+        the fraction is None when nothing was observed.
+        """
+        now = time.time() if now is None else now
+        since = now - window
+        up = seen = 0.0
+        for run, start, end in self._spans(server_id, now):
+            start = max(start, since)
+            if end <= start:
+                continue
+            seen += end - start
+            if run.state == "running":
+                up += end - start
+        return (up / seen if seen else None), seen
+
+    def unexpected_stops(self, server_id: str, window: float, now: float = None):
+        since = (time.time() if now is None else now) - window
+        return sum(1 for r in self._runs.get(server_id) or () if r.cause == "unexpected" and r.started >= since)
+
+    def transition_times(self, server_id: str, target: str):
+        """seconds each completed transition to `target` took, oldest first"""
+        return [s for _, t, s, timed_out in self._transitions.get(server_id) or () if t == target and not timed_out]
+
+    # persistence
+
+    def _schedule_flush(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        while self._dirty or self._pending:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+
+    async def flush(self):
+        if self._db is None or not (self._dirty or self._pending):
+            self._dirty.clear()
+            self._pending.clear()
+            return
+        runs = [(run, run.row()) for run in self._dirty]
+        pending = self._pending
+        self._dirty = set()
+        self._pending = []
+        try:
+            await asyncio.to_thread(self._write, runs, pending)
+        except Exception as e:
+            log.error("status history flush error: %r", e)
+
+    def _write(self, runs, pending):
+        with self._lock, self._db:
+            for run, row in runs:
+                if run.id is None:
+                    run.id = self._db.execute(
+                        "INSERT INTO runs (server_id, state, started, ended, samples, peak_players, cause)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)", row
+                    ).lastrowid
+                else:
+                    self._db.execute(
+                        "UPDATE runs SET server_id = ?, state = ?, started = ?, ended = ?, samples = ?,"
+                        " peak_players = ?, cause = ? WHERE id = ?", (*row, run.id)
+                    )
+            for sql, params in pending:
+                self._db.execute(sql, params)
+            now = time.time()
+            if now - self._pruned_at > 3600:
+                self._pruned_at = now
+                cutoff = now - self.retention
+                self._db.execute("DELETE FROM runs WHERE ended < ?", (cutoff,))
+                self._db.execute("DELETE FROM power_events WHERE ts < ?", (cutoff,))
+                self._db.execute("DELETE FROM transitions WHERE ts < ?", (cutoff,))
+
+    async def close(self):
+        await self.flush()
+        if self._db is not None:
+            db, self._db = self._db, None
+            await asyncio.to_thread(db.close)
+
+
+history = StatusHistory(HISTORY_DB, HISTORY_RETENTION_DAYS * 86400, ring=HISTORY_RING, max_gap=2 * STATUS_POLL_SLOW)
+
+
+class MinehutBot(commands.Bot):
+    _web_runners = ()
+
+    async def setup_hook(self):
+        _instrument_discord_http(self.http)
+        if LOOP_WATCHDOG:
+            loop_watchdog.start()
+        if SYNC_APP_COMMANDS:
+            # global sync is rate limited, only needed after slash commands change
+            synced = await self.tree.sync()
+            log.info("synced %d slash commands", len(synced))
+        self._web_runners = [
+            await start_web_server(host, port, routes) for port, (host, routes) in _web_servers().items()
+        ]
+
+    async def close(self):
+        loop_watchdog.stop()
+        await recorder.flush()
+        for runner in self._web_runners:
+            await runner.cleanup()
+        for server_id in list(_pollers):
+            untrack_server(server_id)
+        stop_requests.stop()
+        try:
+            await super().close()
+        finally:
+            await minehut.close()
+            await bot_state.flush()
+            await history.close()
+
+
+def _instrument_discord_http(http):
+    """
+    Wraps discord.py's REST entry point so every Discord call (message
+    edits, sends, reactions, ...) is timed by method and route template.
+    """
+    original = http.request
+
+    async def timed_request(route, **kwargs):
+        with metrics.timer("discord_request_seconds", method=route.method, route=route.path):
+            return await original(route, **kwargs)
+
+    http.request = timed_request
+
+async def _metrics_handler(request):
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+_status_documents = {}  # server number -> (version key, body bytes, etag)
+
+def _status_source(server: ServerInfo):
+    """(state, snapshot, last_action, by, updated_at) from memory: the poller, else what was persisted"""
+    poller = _pollers.get(server.id)
+    if poller is not None and poller.state is not None:
+        return poller.state, poller.snapshot, poller.last_action, poller.by, poller.published_at
+    saved = _load_last_status(server.id)
+    if saved is not None:
+        state, snapshot, last_action, by = saved
+        return state, snapshot, last_action, by, None
+    return "unknown", status_cache.last(server.id), None, None, None
+
+def _status_document(number: str):
+    """
+    (body, etag) for /status/<number>. Rebuilt only when something it shows
+    changes, every other request reuses the same bytes and ETag.
+    """
+    server = SERVERS[number]
+    state, snapshot, last_action, by, updated_at = _status_source(server)
+    players = snapshot.players if snapshot is not None else None
+    max_players = snapshot.max_players if snapshot is not None else None
+    key = (number == CURRENT_SERVER_NUMBER, state, players, max_players, last_action, by, updated_at)
+    cached = _status_documents.get(number)
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+    body = _json_dumps({
+        "server": number,
+        "label": server.label,
+        "ip": server.ip,
+        "ip_message": _format_server_ip_message(number),
+        "active": number == CURRENT_SERVER_NUMBER,
+        "state": state,
+        "players": players,
+        "max_players": max_players,
+        "last_action": last_action,
+        "by": by,
+        "updated_at": datetime.utcfromtimestamp(updated_at).isoformat() + "Z" if updated_at else None,
+    }).encode("utf-8")
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+    _status_documents[number] = (key, body, etag)
+    return body, etag
+
+async def _status_api_handler(request):
+    number = request.match_info.get("number", CURRENT_SERVER_NUMBER)
+    if number not in SERVERS:
+        metrics.inc("status_api_requests_total", code=404)
+        return web.json_response({"error": f"unknown server {number}"}, status=404)
+    body, etag = _status_document(number)
     headers = {
-        "authorization": MINEHUT_TOKEN,
-        "accept": "application/json",
-        "content-type": "application/json",
-        "origin": "https://app.minehut.com",
-        "referer": "https://app.minehut.com/",
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={STATUS_API_MAX_AGE}",
+        "Access-Control-Allow-Origin": "*",
     }
+    if etag in request.headers.get("If-None-Match", ""):
+        metrics.inc("status_api_requests_total", code=304)
+        return web.Response(status=304, headers=headers)
+    metrics.inc("status_api_requests_total", code=200)
+    return web.Response(body=body, content_type="application/json", headers=headers)
+
+metrics.describe("status_api_requests_total", "counter", "Status API requests by response code")
+
+def _web_servers():
+    """
+    port -> (host, {path: handler}) for the enabled endpoints. Endpoints
+    configured on the same port share one server.
+    """
+    servers = {}
+    if METRICS_PORT:
+        servers.setdefault(METRICS_PORT, (METRICS_HOST, {}))[1]["/metrics"] = _metrics_handler
+    if STATUS_API_PORT:
+        routes = servers.setdefault(STATUS_API_PORT, (STATUS_API_HOST, {}))[1]
+        routes["/status"] = _status_api_handler
+        routes["/status/{number}"] = _status_api_handler
+    return servers
+
+async def start_web_server(host: str, port: int, routes: dict):
+    """serves `routes` ({path: GET handler}) on http://host:port, returns the runner"""
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log.info("serving %s on http://%s:%s", ", ".join(routes), host, port)
+    return runner
+
 
+intents = discord.Intents.default()
+intents.message_content = True
+bot_options = {}
+if LEAN_GATEWAY:
+    # nothing needs the member list: role checks use ctx.author (commands) and
+    # payload.member (reactions), both delivered with the event itself
+    intents.members = False
+    bot_options.update(
+        chunk_guilds_at_startup=False,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        max_messages=LEAN_MAX_MESSAGES or None,
+    )
+else:
+    intents.members = True
+
+bot = MinehutBot(command_prefix="!", intents=intents, **bot_options)
+async def get_minehut_snapshot(server_id: str = None, fresh: bool = False, max_age: float = None):
+    """
+    Returns a ServerSnapshot (or None on error) for server_id, defaulting to
+    the active server. Reads are served from status_cache; pass fresh=True
+    right after a power action to force a new request, or max_age to accept
+    an older cached snapshot (e.g. whatever the poller saw last).
+    """
+    server_id = server_id or SERVER_ID
+    if max_age is not None and not fresh:
+        cached = status_cache.get(server_id, max_age=max_age)
+        if cached is not None:
+            return cached
+    value = await status_cache.fetch(server_id, _fetch_minehut_status, fresh=fresh, observe=_observe_status)
+    if value is None and minehut.breaker.is_open:
+        # Minehut is down: answer with the last state we saw instead of nothing
+        value = status_cache.last(server_id)
+    return value
+
+async def get_minehut_status(server_id: str = None, fresh: bool = False):
+    """
+    Returns running/stopped (or None on error), see get_minehut_snapshot.
+    """
+    snapshot = await get_minehut_snapshot(server_id, fresh=fresh)
+    return snapshot.state if snapshot is not None else None
+
+async def _fetch_minehut_status(server_id: str):
+    with metrics.timer("minehut_request_seconds", op="status") as labels:
+        labels["status"] = "error"
+        result = await _fetch_minehut_status_inner(server_id, labels)
+    metrics.inc("minehut_requests_total", op="status", status=labels["status"])
+    return result
+
+def _observe_status(server_id: str, snapshot: "ServerSnapshot"):
+    # only reads that didn't start before a power action (see StatusCache)
+    history.observe(server_id, snapshot.state, snapshot.players)
+    notifier.observed(server_id, snapshot.state)
+
+async def _fetch_minehut_status_inner(server_id: str, labels: dict):
     try:
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-            async with session.get(url, headers=headers) as resp:
-                text = await resp.text()
-                print("get_minehut_status response:", resp.status, text[:500])  # print first 500 chars
-                if resp.status != 200:
-                    return None
-                data = await resp.json()
-                server = data.get("server", {}) or {}
-
-                # Most reliable signal: explicit online boolean.
-                online_value = server.get("online")
-                if isinstance(online_value, bool):
-                    normalized = _coerce_status_state(online_value)
-                    print("minehut parsed state:", normalized, "| raw online:", repr(online_value))
-                    return normalized
-
-                # Prefer explicit lifecycle/status text when available.
-                candidates = [
-                    server.get("state"),
-                    server.get("status"),
-                    server.get("lifecycle_state"),
-                    data.get("state"),
-                    data.get("status"),
-                ]
-                for c in candidates:
-                    normalized = _coerce_status_state(c)
-                    if normalized != "unknown":
-                        print("minehut parsed state:", normalized, "| raw:", repr(c))
-                        return normalized
-
-                normalized = "stopped"
-                print("minehut parsed state:", normalized, "| raw fallback (no online/state)")
-                return normalized
+        status, body = await minehut.request("GET", f"/server/{server_id}")
+        labels["status"] = status
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("get_minehut_status response: %s %s", status, _truncate(body.decode("utf-8", "replace")))
+        if status != 200:
+            return None
+        return ServerSnapshot.parse(server_id, body)
+    except MinehutUnavailable as e:
+        labels["status"] = "unavailable"
+        log.warning("get_minehut_status exception: %r", e)
+        return None
     except Exception as e:
-        print("get_minehut_status exception:", repr(e))
+        log.warning("get_minehut_status exception: %r", e)
         return None
-async def minehut_power(action):
-    url = f"https://api.minehut.com/server/{SERVER_ID}/{action}"
-    headers = {
-    "authorization": MINEHUT_TOKEN,
-    "accept": "application/json",
-    "content-type": "application/json",
-    "origin": "https://app.minehut.com",
-    "referer": "https://app.minehut.com/",
-    "user-agent": "Mozilla/5.0",
+
+# extra headers the power endpoints expect on top of the client defaults
+_POWER_HEADERS = {
     "x-profile-id": "fcb6722f-b1ec-4b87-b5ed-cf8a0cab8c31",
-    "x-session-id": "97e35639-7207-4e54-ad25-c14c17488292"
-    }
+    "x-session-id": "97e35639-7207-4e54-ad25-c14c17488292",
+}
+
+async def minehut_power(action, server_id: str = None):
+    server_id = server_id or SERVER_ID
+    with metrics.timer("minehut_request_seconds", op=action) as labels:
+        status = await _minehut_power(action, server_id)
+        labels["status"] = status if status is not None else "error"
+    metrics.inc("minehut_requests_total", op=action, status=labels["status"])
+    history.record_power(server_id, action, status)
+    return status
+
+async def _minehut_power(action, server_id: str):
+    path = f"/server/{server_id}/{action}"
 
-    # debug
-    print(">>> minehut url:", url)
-    print(">>> headers keys/types:", [(k, type(k).__name__) for k in headers.keys()])
+    log.debug("minehut power %s -> %s", action, minehut.base_url + path)
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers) as resp:
-                text = await resp.text()
-                print("minehut response:", resp.status, text)
-                return resp.status
+        status, body = await minehut.request(
+            "POST", path, idempotent=False, headers=_POWER_HEADERS, timeout=aiohttp.ClientTimeout(total=30)
+        )
+        log.info("minehut %s response: %s %s", action, status, _truncate(body.decode("utf-8", "replace")))
+        if status == 200:
+            # state is changing, don't serve the pre-action read to anyone
+            status_cache.invalidate(server_id)
+        return status
+    except MinehutUnavailable:
+        log.warning("minehut is unavailable (circuit open), not sending %s", action)
+        return None
     except Exception as e:
-        print("error sending request to minehut:", repr(e))
+        log.error("error sending request to minehut: %r", e)
         return None
 
+# state each power action ends in, and how long it usually takes to get there
+POWER_TARGETS = {"start_service": "running", "shutdown": "stopped"}
+DEFAULT_TRANSITION_SECONDS = {"running": 45.0, "stopped": 20.0}
+
+class PowerOutcome:
+    __slots__ = ("status", "shared", "eta")
+
+    def __init__(self, status=None, shared: bool = False, eta: int = None):
+        self.status = status  # HTTP status of the POST, None on error
+        self.shared = shared  # joined a POST another caller already had in flight
+        self.eta = eta        # set instead of status when the same transition is already underway
+
+class PowerCoordinator:
+    """
+    Per-server gate in front of minehut_power:
+    - the same action already being POSTed is joined, every caller gets
+      that one call's result
+    - while the poller is still waiting for that action's state, nothing is
+      sent and the caller gets an ETA instead
+    - conflicting actions (start vs shutdown) run one at a time, in the
+      order they were requested
+    - an accepted POST is handed to the poller before the call counts as
+      finished, so there is no gap between the two where a repeated command
+      would POST again; callers only reply
+    """
+
+    def __init__(self):
+        self._locks = {}       # server_id -> asyncio.Lock (FIFO)
+        self._inflight = {}    # (server_id, action) -> task
+        self._estimates = dict(DEFAULT_TRANSITION_SECONDS)  # target state -> seconds (moving average)
+
+    def record_transition(self, state: str, seconds: float):
+        prev = self._estimates.get(state, seconds)
+        self._estimates[state] = 0.7 * prev + 0.3 * seconds
+
+    def eta(self, server_id: str, action: str):
+        """seconds left if `action`'s transition is already being waited for, else None"""
+        target = POWER_TARGETS.get(action)
+        poller = _pollers.get(server_id)
+        if target is None or poller is None or poller.expected != target:
+            return None
+        elapsed = time.monotonic() - poller.expected_since
+        return max(1, round(self._estimates.get(target, 45.0) - elapsed))
+
+    async def request(self, action: str, server_id: str = None, by: str = None, last_action: str = None):
+        """by/last_action label the embed if this call ends up sending the POST"""
+        server_id = server_id or SERVER_ID
+        key = (server_id, action)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.inc("power_requests_total", action=action, outcome="joined")
+            return PowerOutcome(await asyncio.shield(task), shared=True)
+
+        eta = self.eta(server_id, action)
+        if eta is not None:
+            metrics.inc("power_requests_total", action=action, outcome="already")
+            return PowerOutcome(eta=eta)
+
+        task = asyncio.ensure_future(self._send(server_id, action, by, last_action))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        metrics.inc("power_requests_total", action=action, outcome="sent")
+        return PowerOutcome(await asyncio.shield(task))
+
+    async def _send(self, server_id: str, action: str, by: str, last_action: str):
+        lock = self._locks.get(server_id)
+        if lock is None:
+            lock = self._locks[server_id] = asyncio.Lock()
+        async with lock:
+            status = await minehut_power(action, server_id)
+        target = POWER_TARGETS.get(action)
+        if status == 200 and target is not None:
+            # still inside the in-flight task: anyone asking now joins it or gets the ETA
+            await refresh_and_update(
+                trigger_by=by,
+                action_hint=last_action,
+                immediate_state=target,
+                wait_seconds=3,
+                expected_final=target,
+                timeout_seconds=45,
+                poll_interval=5,
+                server_id=server_id,
+            )
+        return status
+
+power = PowerCoordinator()
+metrics.describe("power_requests_total", "counter", "Power requests by action and outcome (sent/joined/already)")
+
+@bot.event
+async def on_command(ctx):
+    # fires before checks, so commands rejected by has_role are recorded too
+    recorder.command(ctx)
+
+@bot.before_invoke
+async def _command_started(ctx):
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def _command_finished(ctx):
+    started = getattr(ctx, "started_at", None)
+    if started is None:
+        return
+    outcome = "error" if ctx.command_failed else "ok"
+    name = ctx.command.qualified_name if ctx.command else "unknown"
+    metrics.observe("command_seconds", time.perf_counter() - started, command=name, outcome=outcome)
+    metrics.inc("commands_total", command=name, outcome=outcome)
+
+_startup_seconds = None
+
+def _cached_member_count():
+    return sum(len(g.members) for g in bot.guilds)
+
+metrics.gauge_fn("process_rss_bytes", "Resident memory of the bot process", _rss_bytes)
+metrics.gauge_fn("startup_seconds", "Seconds from process start to the first on_ready",
+                 lambda: _startup_seconds or 0)
+metrics.gauge_fn("cached_members", "Members held in discord.py's member cache", _cached_member_count)
+
+def _report_startup():
+    """
+    Logged on the first on_ready so default and LEAN_GATEWAY=1 runs can be
+    compared (also exported as metrics).
+    """
+    global _startup_seconds
+    if _startup_seconds is not None:
+        return
+    _startup_seconds = time.monotonic() - _STARTED_AT
+    log.info(
+        "startup: ready in %.1fs | rss %.1f MB | %d guilds | %d cached members | lean gateway: %s | runtime: %s",
+        _startup_seconds,
+        _rss_bytes() / (1024 * 1024),
+        len(bot.guilds),
+        _cached_member_count(),
+        "on" if LEAN_GATEWAY else "off",
+        _runtime_report(),
+    )
+
 @bot.event
 async def on_ready():
+    global _startup_synced
+    log.info("bot is ready and running, %s", bot.user.name)
+    # on_ready fires again on every gateway reconnect; the sync is only needed once
+    if _startup_synced:
+        return
+    _startup_synced = True
+    _report_startup()
+    if recorder.enabled:
+        recorder.start()
+        log.info("recording commands, reactions and Minehut responses to %s", RECORD_FILE)
+    stop_requests.start()
+    await _startup_sync()
+    notifier.start()
+
+_startup_synced = False
+
+async def _startup_sync():
+    """
+    Brings the IP and status messages up to date after a restart. The IP
+    message and the status embed are handled concurrently; the status embed
+    gets the persisted last-known state right away and the poller
+    revalidates it in the background.
+    """
     global SERVER_ID, CURRENT_SERVER_NUMBER
     if _load_active_server_number() is None:
+        # first run without saved state: the IP message tells us which server is active
         detected = await _detect_server_number_from_ip_message()
-        if detected in {"1", "2"}:
+        if detected in SERVERS:
             CURRENT_SERVER_NUMBER = detected
             _save_active_server_number(detected)
             SERVER_ID = _get_server_id_from_number(detected) or SERVER_ID
-    print(f"bot is ready and running, {bot.user.name}")
-    try:
-        await update_server_ip_message(CURRENT_SERVER_NUMBER)
-    except Exception as e:
-        print("on_ready server ip sync error:", repr(e))
+
+    results = await asyncio.gather(
+        update_server_ip_message(CURRENT_SERVER_NUMBER),
+        _publish_last_known_status(),
+        return_exceptions=True,
+    )
+    for r in results:
+        if isinstance(r, Exception):
+            log.error("on_ready sync error: %r", r)
+
+async def _publish_last_known_status():
+    poller = track_server(SERVER_ID)
+    saved = _load_last_status(SERVER_ID)
+    if saved is None:
+        # nothing persisted: the poller's first (immediate) poll publishes
+        return
+    state, snapshot, last_action, by = saved
+    poller.seed(state, snapshot, last_action, by)
+    await poller.publish(state)
+
+class ProgressReply:
+    """
+    The one reply a command keeps editing as it moves along, instead of a new
+    reply per step. The first reply is held back for `delay` seconds (or until
+    finish()), so a command that completes quickly sends a single message
+    with its final text. Later updates edit that message; updates arriving
+    while a send/edit is in flight collapse into the latest one, and edits
+    are paced by the channel's RateBucket. For slash commands the first
+    reply fills in the deferred interaction response.
+    """
+
+    def __init__(self, ctx, delay: float = PROGRESS_DELAY):
+        self.ctx = ctx
+        self.delay = delay
+        self.message = None
+        self._fields = None     # latest fields not delivered yet
+        self._sent = None       # fingerprint of what the message shows
+        self._final = asyncio.Event()
+        self._worker = None
+
+    def update(self, content: str = None, **fields):
+        fields["content"] = content
+        self._fields = fields
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+        return self._worker
+
+    async def finish(self, content: str = None, **fields):
+        """last update of the command, sent right away; waits until delivered"""
+        self._final.set()
+        await self.update(content, **fields)
+
+    async def _drain(self):
+        while self._fields is not None:
+            if self.message is None and not self._final.is_set():
+                try:
+                    await asyncio.wait_for(self._final.wait(), timeout=self.delay)
+                except asyncio.TimeoutError:
+                    pass
+            elif self.message is not None:
+                await message_editor.bucket(self.ctx.channel.id).acquire()
+            # take the newest fields only now, anything queued while waiting is folded in
+            fields, self._fields = self._fields, None
+            fp = _edit_fingerprint(fields)
+            if fp == self._sent:
+                continue
+            try:
+                if self.message is None:
+                    self.message = await self.ctx.reply(**fields)
+                else:
+                    await self.message.edit(**fields)
+                self._sent = fp
+            except Exception as e:
+                log.warning("progress reply to %s failed: %r", getattr(self.ctx.command, "name", "?"), e)
 
 @bot.command()
 async def hello(ctx):
@@ -425,225 +2548,406 @@ async def assign(ctx):
     else:
         await ctx.send("role doesn't exist bro")
 
-@bot.command()
-async def switchserver(ctx, *, msg):
+@bot.hybrid_command(description="Switch the active Minehut server")
+async def switchserver(ctx, *, msg: str):
     global SERVER_ID, CURRENT_SERVER_NUMBER
-    if msg == "1":
-        await ctx.reply("Switching to server 1...")
-        try:
-            SERVER_ID = os.getenv("MINEHUT_SERVERID1")
-            CURRENT_SERVER_NUMBER = "1"
-            _save_active_server_number("1")
-            await update_server_ip_message("1")
-            await ctx.reply("Switched to server 1 successfully!")
-            result = await get_minehut_status()
-            state = _coerce_status_state(result)
-            if state == "running":
-                await ctx.reply("\U0001F7E2 The server is currently running.")
-                await refresh_and_update(trigger_by=str(ctx.author), action_hint="Server switched", immediate_state="Running", wait_seconds=0)
-            elif state == "stopped":
-                await ctx.reply("\U0001F534 The server is currently stopped.")
-                await refresh_and_update(trigger_by=str(ctx.author), action_hint="Server switched", immediate_state="Stopped", wait_seconds=0)
-            else:
-                await ctx.reply("Could not retrieve the server status. Please check the bot console.")
-        except Exception as e:
-            await ctx.reply("Failed to switch server. Check the bot console.")
-            print("switchserver error:", repr(e))
-    elif msg == "2":
-        await ctx.reply("Switching to server 2...")
-        try:
-            SERVER_ID = os.getenv("MINEHUT_SERVERID2")
-            CURRENT_SERVER_NUMBER = "2"
-            _save_active_server_number("2")
-            await update_server_ip_message("2")
-            await ctx.reply("Switched to server 2 successfully!")
-            result = await get_minehut_status()
-            state = _coerce_status_state(result)
-            if state == "running":
-                await ctx.reply("\U0001F7E2 The server is currently running.")
-                await refresh_and_update(trigger_by=str(ctx.author), action_hint="Server switched", immediate_state="Running", wait_seconds=0)
-            elif state == "stopped":
-                await ctx.reply("\U0001F534 The server is currently stopped.")
-                await refresh_and_update(trigger_by=str(ctx.author), action_hint="Server switched", immediate_state="Stopped", wait_seconds=0)
-            else:
-                await ctx.reply("Could not retrieve the server status. Please check the bot console.")
-        except Exception as e:
-            await ctx.reply("Failed to switch server. Check the bot console.")
-            print("switchserver error:", repr(e))
-    else:
-        await ctx.reply("Invalid server number. Use `!switchserver 1` or `!switchserver 2`.")
+    server = SERVERS.get(msg.strip())
+    if server is None:
+        options = " or ".join(f"`!switchserver {n}`" for n in SERVERS)
+        await ctx.reply(f"Invalid server number. Use {options}.")
+        return
+
+    await ctx.defer()
+    progress = ProgressReply(ctx)
+    progress.update(f"Switching to server {server.number}...")
+    try:
+        previous = _pollers.get(SERVER_ID)
+        SERVER_ID = server.id
+        CURRENT_SERVER_NUMBER = server.number
+        _save_active_server_number(server.number)
+        # a start/shutdown still pending on the old server, or !notifyme users
+        # waiting on it, keep its poller; it retires itself once that's done
+        if previous is not None and previous.idle():
+            untrack_server(previous.server_id)
+        poller = _pollers.get(server.id)
+        if poller is not None:
+            # the state read below replaces whatever it was still waiting for
+            poller.drop_transition()
+            poller.activate()
+        await update_server_ip_message(server.number)
+        switched = f"Switched to server {server.number} successfully!"
+        progress.update(switched)
+        result = await get_minehut_status()
+        state = _coerce_status_state(result)
+        if state == "running":
+            await progress.finish(f"{switched}\n\U0001F7E2 The server is currently running.")
+            await refresh_and_update(trigger_by=str(ctx.author), action_hint="Server switched", immediate_state="Running", wait_seconds=0)
+        elif state == "stopped":
+            await progress.finish(f"{switched}\n\U0001F534 The server is currently stopped.")
+            await refresh_and_update(trigger_by=str(ctx.author), action_hint="Server switched", immediate_state="Stopped", wait_seconds=0)
+        else:
+            await progress.finish(f"{switched}\nCould not retrieve the server status. Please check the bot console.")
+    except Exception as e:
+        await progress.finish("Failed to switch server. Check the bot console.")
+        log.error("switchserver error: %r", e)
+
+async def fetch_all_statuses():
+    """
+    Snapshot of every registered server, fetched concurrently (at most
+    DASHBOARD_CONCURRENCY requests at once). Returns {number: ServerSnapshot
+    or None}.
+    """
+    sem = asyncio.Semaphore(DASHBOARD_CONCURRENCY)
+
+    async def one(server: ServerInfo):
+        async with sem:
+            return await get_minehut_snapshot(server.id)
+
+    snapshots = await asyncio.gather(*(one(s) for s in SERVERS.values()))
+    return dict(zip(SERVERS, snapshots))
+
+def _format_dashboard_embed(snapshots: dict):
+    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    embed = discord.Embed(title="Minehut Servers", description=f"Last updated: {now}", color=discord.Color.blurple())
+    for number, server in SERVERS.items():
+        snapshot = snapshots.get(number)
+        state = _coerce_status_state(snapshot)
+        name = f"{_STATE_EMOJI.get(state, _STATE_EMOJI['unknown'])} {server.label}"
+        if number == CURRENT_SERVER_NUMBER:
+            name += " (active)"
+        value = f"`{server.ip}`\n{state.capitalize()}"
+        if snapshot is not None:
+            value += _format_snapshot_details(snapshot)
+        embed.add_field(name=name, value=value, inline=True)
+    return embed
+
+@bot.hybrid_command(description="Show the server status, or every server with \"all\"")
+async def serverstatus(ctx, which: str = None):
+    """
+    !serverstatus refreshes the active server's status, !serverstatus all
+    shows every registered server in one embed.
+    """
+    await ctx.defer()
+    if which and which.lower() == "all":
+        snapshots = await fetch_all_statuses()
+        await ctx.reply(embed=_format_dashboard_embed(snapshots))
+        return
+
+    snapshot = await get_minehut_snapshot()
+    state = _coerce_status_state(snapshot)
+    emoji = _STATE_EMOJI.get(state, _STATE_EMOJI["unknown"])
+    text = f"{emoji} Server {CURRENT_SERVER_NUMBER} is currently {state}."
+    if snapshot is not None and state == "running" and snapshot.players is not None:
+        text += f" Players online: {snapshot.players}."
+    await ctx.reply(text)
+    await refresh_and_update(trigger_by=str(ctx.author), action_hint="Status refreshed", wait_seconds=0)
+
+PLAYERS_MAX_AGE = 60  # seconds a cached snapshot is good enough for !players
+
+@bot.command()
+async def players(ctx):
+    """
+    Player count of the active server, answered from the poller's last
+    snapshot when it's recent instead of calling Minehut again.
+    """
+    snapshot = await get_minehut_snapshot(max_age=PLAYERS_MAX_AGE)
+    if snapshot is None:
+        await ctx.reply("Could not retrieve the server status. Please check the bot console.")
+        return
+    if snapshot.state != "running":
+        await ctx.reply(f"\U0001F534 Server {CURRENT_SERVER_NUMBER} is {snapshot.state}, nobody is on.")
+        return
+    cap = f"/{snapshot.max_players}" if snapshot.max_players else ""
+    await ctx.reply(f"\U0001F7E2 {snapshot.players or 0}{cap} players on server {CURRENT_SERVER_NUMBER}.")
+
+def _format_duration(seconds: float):
+    seconds = int(max(0, seconds))
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {secs}s"
+    return f"{secs}s"
+
+def _format_uptime(server_id: str, window: float, label: str):
+    fraction, seen = history.uptime(server_id, window)
+    if fraction is None:
+        return f"{label}: no data"
+    text = f"{label}: {fraction * 100:.1f}%"
+    if seen < window * 0.9:
+        text += f" (of {_format_duration(seen)} observed)"
+    return text
+
+@bot.command()
+async def uptime(ctx):
+    """
+    How long the active server has been up/down and its uptime over the
+    last day and week, answered from the status history (no Minehut call).
+    """
+    current = history.since(SERVER_ID)
+    if current is None:
+        await ctx.reply("No status history yet for this server.")
+        return
+    state, seconds = current
+    emoji = _STATE_EMOJI.get(state, _STATE_EMOJI["unknown"])
+    stops = history.unexpected_stops(SERVER_ID, 7 * 86400)
+    lines = [
+        f"{emoji} Server {CURRENT_SERVER_NUMBER} has been {state} for {_format_duration(seconds)}.",
+        " | ".join((_format_uptime(SERVER_ID, 86400, "24h"), _format_uptime(SERVER_ID, 7 * 86400, "7d"))),
+        f"Unexpected stops in the last 7 days: {stops}",
+    ]
+    await ctx.reply("\n".join(lines))
+
+HISTORY_LINES = 10  # default number of runs !history lists
+
+@bot.command(name="history")
+async def history_command(ctx, count: int = HISTORY_LINES):
+    """
+    Recent state changes of the active server plus average start/stop
+    times, from the status history (no Minehut call).
+    """
+    runs = history.runs(SERVER_ID, limit=max(1, min(count, 25)))
+    if not runs:
+        await ctx.reply("No status history yet for this server.")
+        return
+    lines = []
+    for run, seconds in runs:
+        emoji = _STATE_EMOJI.get(run.state, _STATE_EMOJI["unknown"])
+        started = datetime.utcfromtimestamp(run.started).strftime("%m-%d %H:%M")
+        line = f"{emoji} {started} UTC {run.state} for {_format_duration(seconds)}"
+        if run.cause == "unexpected":
+            line += " (unexpected)"
+        if run.state == "running" and run.peak_players:
+            line += f", peak {run.peak_players} players"
+        lines.append(line)
+    for target, label in (("running", "start"), ("stopped", "stop")):
+        times = history.transition_times(SERVER_ID, target)
+        if times:
+            lines.append(f"Average {label}: {_format_duration(sum(times) / len(times))} over {len(times)}")
+    await ctx.reply("\n".join(lines))
 
-# minehut control commands
 @bot.command()
+@commands.has_permissions(manage_channels=True)
+async def mirror(ctx, action: str = "on"):
+    """
+    !mirror makes this channel a live copy of the status embed and IP
+    message, !mirror off stops it. Needs Manage Channels.
+    """
+    channel_id = ctx.channel.id
+    if action.lower() == "off":
+        mirrors.remove(channel_id)
+        await ctx.reply("This channel no longer mirrors the server status.")
+        return
+    if channel_id in (STATUS_CHANNEL_ID, SERVER_IP_CHANNEL_ID) or channel_id in mirrors.channels():
+        await ctx.reply("This channel already shows the server status.")
+        return
+    mirrors.add(channel_id)
+    await ctx.reply("This channel now mirrors the server status.")
+    # fill in the new copy right away, the other channels skip the unchanged render
+    poller = _pollers.get(SERVER_ID)
+    if poller is not None and poller.state is not None:
+        await poller.publish(poller.state, force=True)
+    await update_server_ip_message(CURRENT_SERVER_NUMBER)
+
+# minehut control commands
+@bot.hybrid_command(description="Start the active Minehut server")
 async def startserver(ctx):
-    await ctx.reply("Starting server...")
-    # immediate feedback + try to start
-    res = await minehut_power("start_service")
+    # the server this command is about, even if someone switches while it runs
+    server_id = SERVER_ID
+    eta = power.eta(server_id, "start_service")
+    if eta is not None:
+        await ctx.reply(f"The server is already starting, ETA ~{eta}s.")
+        return
+    await ctx.defer()
+    progress = ProgressReply(ctx)
+    # shown only if Minehut takes a while to answer
+    progress.update("Starting server...")
+    outcome = await power.request("start_service", server_id, by=str(ctx.author), last_action="Start requested")
+    if outcome.eta is not None:
+        await progress.finish(f"The server is already starting, ETA ~{outcome.eta}s.")
+        return
+    res = outcome.status
     if res == 200:
-        await ctx.reply("The server is starting. Please wait a few seconds to join.")
-        await refresh_and_update(
-            trigger_by=str(ctx.author),
-            action_hint="Start requested",
-            immediate_state="running",
-            wait_seconds=3,
-            expected_final="running",
-            timeout_seconds=45,
-            poll_interval=5,
-        )
+        # the poller already has the transition (PowerCoordinator hands it over)
+        await progress.finish("The server is starting. Please wait a few seconds to join.")
     elif res is None:
-        await ctx.reply("Error contacting Minehut. Please check the bot console.")
-        await refresh_and_update(trigger_by=str(ctx.author), action_hint="Start failed", immediate_state="Unknown")
+        await progress.finish("Error contacting Minehut. Please check the bot console.")
+        await refresh_and_update(trigger_by=str(ctx.author), action_hint="Start failed", immediate_state="Unknown",
+                                 server_id=server_id)
     else:
-        await ctx.reply(f"Failed to start the server (Status {res}).")
-        await refresh_and_update(trigger_by=str(ctx.author), action_hint=f"Start failed ({res})", immediate_state="Unknown")
+        await progress.finish(f"Failed to start the server (Status {res}).")
+        await refresh_and_update(trigger_by=str(ctx.author), action_hint=f"Start failed ({res})", immediate_state="Unknown",
+                                 server_id=server_id)
 @bot.command()
 @commands.has_role("Server Admin")
 async def goodboy(ctx):
     await ctx.reply("thanks daddy :3")
-@bot.command()
+@bot.hybrid_command(description="Stop the active Minehut server (Server Admin)")
 @commands.has_role("Server Admin")
 async def stopserver(ctx):
-    await ctx.reply("Stopping server...")
-    res = await minehut_power("shutdown")
+    # the server this command is about, even if someone switches while it runs
+    server_id = SERVER_ID
+    eta = power.eta(server_id, "shutdown")
+    if eta is not None:
+        await ctx.reply(f"The server is already stopping, ETA ~{eta}s.")
+        return
+    await ctx.defer()
+    progress = ProgressReply(ctx)
+    progress.update("Stopping server...")
+    outcome = await power.request("shutdown", server_id, by=str(ctx.author), last_action="Shutdown requested")
+    if outcome.eta is not None:
+        await progress.finish(f"The server is already stopping, ETA ~{outcome.eta}s.")
+        return
+    res = outcome.status
     if res == 200:
-        await ctx.reply("\U0001F534 The server has been stopped.")
-        await refresh_and_update(
-            trigger_by=str(ctx.author),
-            action_hint="Shutdown requested",
-            immediate_state="stopped",
-            wait_seconds=3,
-            expected_final="stopped",
-            timeout_seconds=45,
-            poll_interval=5,
-        )
+        await progress.finish("\U0001F534 The server has been stopped.")
     elif res is None:
-        await ctx.reply("Error contacting Minehut. Please check the bot console.")
-        await refresh_and_update(trigger_by=str(ctx.author), action_hint="Shutdown failed", immediate_state="Unknown")
+        await progress.finish("Error contacting Minehut. Please check the bot console.")
+        await refresh_and_update(trigger_by=str(ctx.author), action_hint="Shutdown failed", immediate_state="Unknown",
+                                 server_id=server_id)
     else:
-        await ctx.reply(f"Failed to stop the server (Status {res}).")
-        await refresh_and_update(trigger_by=str(ctx.author), action_hint=f"Stop failed ({res})", immediate_state="Unknown")
+        await progress.finish(f"Failed to stop the server (Status {res}).")
+        await refresh_and_update(trigger_by=str(ctx.author), action_hint=f"Stop failed ({res})", immediate_state="Unknown",
+                                 server_id=server_id)
 
 
-@bot.command()
-async def requeststop(ctx):
+class StopRequestRegistry:
     """
-    Any user can run this to request a server stop.
-    An embed is posted in REQUEST_CHANNEL_ID with ✅ and ❌.
-    The first reaction from a user having ADMIN_ROLE_ID decides.
+    Open !requeststop requests keyed by their admin-channel message id.
+    Persisted in bot_state so pending requests survive a restart. A reaction
+    costs one dict lookup no matter how many requests are open, and a single
+    sweeper task expires them instead of one timer per request.
     """
-    requester = ctx.author
 
-    # 1) acknowledge in the invoking channel and DM the user
-    try:
-        await ctx.reply("Your request to stop the server has been made.")
-    except Exception:
-        # fallback to send if reply fails
-        await ctx.send("Your request to stop the server has been made.")
-    try:
-        await requester.send("Your request to stop the server has been made.")
-    except Exception:
-        # can't DM (maybe blocked), ignore silently
-        print(f"couldn't DM user {requester}")
-
-    # 2) prepare embed for admin approval channel
-    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-    embed = discord.Embed(
-        title="🟡 Server Stop Request",
-        description=(
-            f"**Requester:** {requester.mention} (`{requester}`)\n"
-            f"**Requested at:** {now}\n\n"
-            "React with ✅ to approve and stop the server, or ❌ to deny."
-        ),
-        color=discord.Color.gold()
-    )
-    embed.set_footer(text="Only users with the Senior Admin role can approve/deny this request.")
+    def __init__(self, store: StateStore, key: str = "stop_requests"):
+        self.store = store
+        self.key = key
+        self._requests = {int(k): v for k, v in (store.get(key) or {}).items()}
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def _persist(self):
+        self.store.set(self.key, {str(k): v for k, v in self._requests.items()})
+
+    def add(self, message_id: int, record: dict):
+        recorder.write("stop_request", message_id=message_id)
+        self._requests[message_id] = record
+        self._persist()
+        self._wake.set()
+
+    def get(self, message_id: int):
+        return self._requests.get(message_id)
+
+    def pop(self, message_id: int):
+        record = self._requests.pop(message_id, None)
+        if record is not None:
+            self._persist()
+        return record
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sweep(self):
+        while True:
+            now = time.time()
+            for message_id in [k for k, r in self._requests.items() if r["expires_at"] <= now]:
+                record = self.pop(message_id)
+                try:
+                    await _expire_stop_request(message_id, record)
+                except Exception as e:
+                    log.error("requeststop: expiry error: %r", e)
 
-    # 3) send to admin channel
-    try:
-        admin_channel = bot.get_channel(REQUEST_CHANNEL_ID) or await bot.fetch_channel(REQUEST_CHANNEL_ID)
-    except Exception as e:
-        await ctx.send("Could not find the admin channel. Contact an admin.")
-        print("requeststop: failed to fetch admin channel:", repr(e))
-        return
+            next_at = min((r["expires_at"] for r in self._requests.values()), default=None)
+            self._wake.clear()
+            timeout = None if next_at is None else max(0.0, next_at - time.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
 
-    try:
-        req_msg = await admin_channel.send(embed=embed)
-    except Exception as e:
-        await ctx.send("Failed to post request in admin channel.")
-        print("requeststop: failed to send embed:", repr(e))
-        return
 
-    # add reactions
-    try:
-        await req_msg.add_reaction("✅")
-        await req_msg.add_reaction("❌")
-    except Exception as e:
-        print("requeststop: failed to add reactions:", repr(e))
+stop_requests = StopRequestRegistry(bot_state)
 
-    # 4) wait for an admin reaction
-    def check(reaction, user):
-        # only accept reactions on our request message
-        if reaction.message.id != req_msg.id:
-            return False
-        # ignore bot reactions
-        if user.bot:
-            return False
-        # only accept the two emojis we added
-        if str(reaction.emoji) not in ("✅", "❌"):
-            return False
-        # check user has the Senior Admin role in the guild where the command was run
-        # attempt to get the member object from the guild of the invoking context
-        guild = ctx.guild
-        if not guild:
-            return False
-        member = guild.get_member(user.id)
-        if not member:
-            return False
-        return any(r.id == ADMIN_ROLE_ID for r in member.roles)
+STOP_REQUEST_TIMEOUT = 3600  # 1 hour, change if you want shorter
 
-    timeout_seconds = 3600  # 1 hour, change if you want shorter
+def _stop_request_embed(record: dict, title: str, color: discord.Color, extra: str = ""):
+    embed = discord.Embed(title=title, description=record["description"] + extra, color=color)
+    embed.set_footer(text="Only users with the Senior Admin role can approve/deny this request.")
+    return embed
 
-    try:
-        reaction, user = await bot.wait_for("reaction_add", timeout=timeout_seconds, check=check)
-    except asyncio.TimeoutError:
-        # timed out, update embed and notify requester
-        try:
-            embed.title = "⚪ Server Stop Request — Timed Out"
-            embed.color = discord.Color.light_grey()
-            embed.description += "\n\nNo Senior Admin responded within the timeout window."
-            await req_msg.edit(embed=embed)
-        except Exception:
-            pass
-        # DM the requester
+async def _get_stop_request_parts(message_id: int, record: dict):
+    """
+    Returns (admin_channel, request message handle, requester user) without
+    fetching the request message itself.
+    """
+    channel = await _get_channel(record["channel_id"])
+    req_msg = channel.get_partial_message(message_id)
+    requester = bot.get_user(record["requester_id"])
+    if requester is None:
         try:
-            await requester.send("Your stop request timed out. No Senior Admin approved or denied it.")
+            requester = await bot.fetch_user(record["requester_id"])
         except Exception:
-            pass
+            requester = None
+    return channel, req_msg, requester
+
+async def _dm(user, text: str):
+    if user is None:
         return
+    try:
+        await user.send(text)
+    except Exception:
+        # can't DM (maybe blocked), ignore silently
+        pass
 
-    # 5) process admin decision
-    emoji = str(reaction.emoji)
-    approver = user  # the admin who reacted
+async def _expire_stop_request(message_id: int, record: dict):
+    _, req_msg, requester = await _get_stop_request_parts(message_id, record)
+    # timed out, update embed and notify requester
+    try:
+        await req_msg.edit(embed=_stop_request_embed(
+            record,
+            "⚪ Server Stop Request — Timed Out",
+            discord.Color.light_grey(),
+            "\n\nNo Senior Admin responded within the timeout window.",
+        ))
+    except Exception:
+        pass
+    await _dm(requester, "Your stop request timed out. No Senior Admin approved or denied it.")
+
+async def _decide_stop_request(message_id: int, record: dict, approved: bool, approver):
+    admin_channel, req_msg, requester = await _get_stop_request_parts(message_id, record)
 
     # update embed to show who decided
     decision_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-    if emoji == "✅":
+    if approved:
         # approve -> stop server
         try:
-            embed.title = "🟢 Server Stop Request — Approved"
-            embed.color = discord.Color.green()
-            embed.description += f"\n\n**Approved by:** {approver.mention} (`{approver}`) at {decision_time}"
-            await req_msg.edit(embed=embed)
+            await req_msg.edit(embed=_stop_request_embed(
+                record,
+                "🟢 Server Stop Request — Approved",
+                discord.Color.green(),
+                f"\n\n**Approved by:** {approver.mention} (`{approver}`) at {decision_time}",
+            ))
         except Exception:
             pass
 
         # call the stopping API
         try:
-            # attempt to stop the server using your existing helper
-            stop_res = await minehut_power("shutdown")
+            # the server that was active when the request was made
+            server_id = record.get("server_id") or SERVER_ID
+            outcome = await power.request("shutdown", server_id, by=str(approver), last_action="Shutdown approved")
+            stop_res = 200 if outcome.eta is not None else outcome.status
             if stop_res == 200:
                 result_text = "approved and the server has been stopped."
-                # inform channel and DM requester
                 try:
                     await admin_channel.send(f"Server stop approved by {approver.mention}. Server is stopping.")
                 except Exception:
@@ -656,21 +2960,19 @@ async def requeststop(ctx):
                     pass
         except Exception as e:
             result_text = f"approved but stopping failed (error)."
-            print("requeststop: error when calling minehut_power:", repr(e))
+            log.error("requeststop: error when calling minehut_power: %r", e)
 
-        # DM requester with result
-        try:
-            await requester.send(f"Your request to stop the server was {result_text}")
-        except Exception:
-            pass
+        await _dm(requester, f"Your request to stop the server was {result_text}")
 
-    else:  # emoji == "❌"
+    else:
         # denied
         try:
-            embed.title = "🔴 Server Stop Request — Denied"
-            embed.color = discord.Color.red()
-            embed.description += f"\n\n**Denied by:** {approver.mention} (`{approver}`) at {decision_time}"
-            await req_msg.edit(embed=embed)
+            await req_msg.edit(embed=_stop_request_embed(
+                record,
+                "🔴 Server Stop Request — Denied",
+                discord.Color.red(),
+                f"\n\n**Denied by:** {approver.mention} (`{approver}`) at {decision_time}",
+            ))
         except Exception:
             pass
 
@@ -679,24 +2981,287 @@ async def requeststop(ctx):
         except Exception:
             pass
 
-        # DM requester
-        try:
-            await requester.send("Your request to stop the server was denied by a Senior Admin.")
-        except Exception:
-            pass
+        await _dm(requester, "Your request to stop the server was denied by a Senior Admin.")
 
     # cleanup: remove reactions so it can't be actioned again
     try:
         await req_msg.clear_reactions()
     except Exception:
         pass
+
+@bot.hybrid_command(description="Ask the admins to stop the server")
+async def requeststop(ctx):
+    """
+    Any user can run this to request a server stop.
+    An embed is posted in REQUEST_CHANNEL_ID with ✅ and ❌.
+    The first reaction from a user having ADMIN_ROLE_ID decides
+    (handled by on_raw_reaction_add).
+    """
+    requester = ctx.author
+
+    # 1) acknowledge in the invoking channel; the requester gets a DM once an
+    # admin decides, so no DM here
+    await ctx.defer()
+    progress = ProgressReply(ctx)
+    progress.update("Your request to stop the server has been made.")
+
+    # 2) prepare embed for admin approval channel
+    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    record = {
+        "requester_id": requester.id,
+        "guild_id": ctx.guild.id if ctx.guild else None,
+        "channel_id": REQUEST_CHANNEL_ID,
+        "server_id": SERVER_ID,
+        "expires_at": time.time() + STOP_REQUEST_TIMEOUT,
+        "description": (
+            f"**Requester:** {requester.mention} (`{requester}`)\n"
+            f"**Server:** {SERVERS[CURRENT_SERVER_NUMBER].label}\n"
+            f"**Requested at:** {now}\n\n"
+            "React with ✅ to approve and stop the server, or ❌ to deny."
+        ),
+    }
+    embed = _stop_request_embed(record, "🟡 Server Stop Request", discord.Color.gold())
+
+    # 3) send to admin channel
+    try:
+        admin_channel = await _get_channel(REQUEST_CHANNEL_ID)
+    except Exception as e:
+        await progress.finish("Could not find the admin channel. Contact an admin.")
+        log.error("requeststop: failed to fetch admin channel: %r", e)
+        return
+
+    try:
+        req_msg = await admin_channel.send(embed=embed)
+    except Exception as e:
+        await progress.finish("Failed to post request in admin channel.")
+        log.error("requeststop: failed to send embed: %r", e)
+        return
+
+    # 4) register before reacting so an instant admin reaction isn't missed
+    stop_requests.add(req_msg.id, record)
+    await progress.finish("Your request to stop the server has been sent to the admins.")
+
+    try:
+        await req_msg.add_reaction("✅")
+        await req_msg.add_reaction("❌")
+    except Exception as e:
+        log.warning("requeststop: failed to add reactions: %r", e)
+
+@bot.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    # one dict lookup for every reaction in the guild
+    record = stop_requests.get(payload.message_id)
+    if record is None:
+        return
+    recorder.reaction(payload)
+    # only accept the two emojis we added
+    emoji = str(payload.emoji)
+    if emoji not in ("✅", "❌"):
+        return
+    # the member comes with the gateway payload, no member cache lookup needed
+    member = payload.member
+    if member is None or member.bot:
+        return
+    if record.get("guild_id") is not None and payload.guild_id != record["guild_id"]:
+        return
+    if member.get_role(ADMIN_ROLE_ID) is None:
+        return
+    # pop first so a second admin reaction can't decide it again
+    if stop_requests.pop(payload.message_id) is None:
+        return
+    await _decide_stop_request(payload.message_id, record, emoji == "✅", member)
+
+class StateNotifier:
+    """
+    !notifyme subscriptions: users waiting for a server to reach a state.
+    Stored in bot_state as server id -> state -> user id -> expiry, so asking
+    twice only extends the expiry. When a status read observes a state that
+    people are waiting for, each of them is queued for one DM; up to
+    `concurrency` workers send them, all paced by a single RateBucket.
+    """
+
+    def __init__(self, store: StateStore, ttl: float, concurrency: int = 3, rate: int = 5, per: float = 5,
+                 key: str = "notify"):
+        self.store = store
+        self.ttl = ttl
+        self.concurrency = max(1, concurrency)
+        self.key = key
+        self.bucket = RateBucket(rate, per)
+        self._queue = deque()   # (user_id, text) waiting to be sent
+        self._workers = set()
+
+    def _data(self):
+        return {sid: {state: dict(users) for state, users in states.items()}
+                for sid, states in (self.store.get(self.key) or {}).items()}
+
+    def _save(self, data: dict):
+        now = time.time()
+        # expired subscriptions are dropped whenever the store is written anyway
+        cleaned = {}
+        for sid, states in data.items():
+            states = {state: {u: exp for u, exp in users.items() if exp > now} for state, users in states.items()}
+            states = {state: users for state, users in states.items() if users}
+            if states:
+                cleaned[sid] = states
+        self.store.set(self.key, cleaned)
+
+    def subscribe(self, server_id: str, state: str, user_id: int):
+        """True for a new subscription, False if it only extended an existing one"""
+        data = self._data()
+        users = data.setdefault(server_id, {}).setdefault(state, {})
+        new = users.get(str(user_id), 0) <= time.time()
+        users[str(user_id)] = time.time() + self.ttl
+        self._save(data)
+        return new
+
+    def unsubscribe(self, user_id: int):
+        data = self._data()
+        removed = 0
+        for states in data.values():
+            for users in states.values():
+                removed += users.pop(str(user_id), None) is not None
+        self._save(data)
+        return removed
+
+    def waiting(self, server_id: str, state: str = None):
+        """number of users waiting for `state` (any state when None)"""
+        states = (self.store.get(self.key) or {}).get(server_id) or {}
+        now = time.time()
+        return sum(
+            1 for s, users in states.items() if state in (None, s) for exp in users.values() if exp > now
+        )
+
+    def servers(self):
+        """server ids somebody is waiting on"""
+        return [server_id for server_id in (self.store.get(self.key) or {}) if self.waiting(server_id)]
+
+    def start(self):
+        # subscriptions survive a restart, so must the pollers that serve them
+        for server_id in self.servers():
+            track_server(server_id)
+
+    def observed(self, server_id: str, state: str):
+        # called on every status read, so bail out before copying anything
+        if not ((self.store.get(self.key) or {}).get(server_id) or {}).get(state):
+            return
+        data = self._data()
+        users = data[server_id].pop(state, {})
+        self._save(data)
+        now = time.time()
+        text = _notify_text(server_id, state)
+        due = [int(u) for u, exp in users.items() if exp > now]
+        self._queue.extend((user_id, text) for user_id in due)
+        log.info("notifying %d users that %s is %s", len(due), server_id, state)
+        while self._queue and len(self._workers) < self.concurrency:
+            task = asyncio.create_task(self._drain())
+            self._workers.add(task)
+            task.add_done_callback(self._workers.discard)
+
+    async def _drain(self):
+        while self._queue:
+            user_id, text = self._queue.popleft()
+            await self.bucket.acquire()
+            user = bot.get_user(user_id)
+            if user is None:
+                try:
+                    user = await bot.fetch_user(user_id)
+                except Exception:
+                    metrics.inc("notify_dms_total", result="unknown_user")
+                    continue
+            await _dm(user, text)
+            metrics.inc("notify_dms_total", result="sent")
+
+
+def _notify_text(server_id: str, state: str):
+    server = next((s for s in SERVERS.values() if s.id == server_id), None)
+    name = server.label if server else "The server"
+    if state == "running":
+        ip = f" Join at `{server.ip}`." if server else ""
+        return f"\U0001F7E2 {name} is up!{ip}"
+    return f"\U0001F534 {name} has stopped."
+
+notifier = StateNotifier(bot_state, NOTIFY_TTL, NOTIFY_DM_CONCURRENCY, NOTIFY_DM_RATE, NOTIFY_DM_PER)
+metrics.describe("notify_dms_total", "counter", "!notifyme DMs by result")
+metrics.gauge_fn("notify_subscriptions", "Users waiting for a !notifyme DM",
+                 lambda: sum(notifier.waiting(s.id) for s in SERVERS.values()))
+
+@bot.hybrid_command(description="DM me when the server is up (or stopped)")
+async def notifyme(ctx, when: str = "running"):
+    """
+    !notifyme DMs you once the active server is running, !notifyme stopped
+    once it has stopped, !notifyme off cancels. Answered without calling
+    Minehut; subscriptions expire after NOTIFY_TTL. They stay with the server
+    that was active, which keeps being polled after a !switchserver.
+    """
+    if when.lower() == "off":
+        removed = notifier.unsubscribe(ctx.author.id)
+        await ctx.reply("Notification cancelled." if removed else "You weren't waiting for a notification.")
+        return
+    target = _coerce_status_state(when)
+    if target not in ("running", "stopped"):
+        await ctx.reply("Use `!notifyme`, `!notifyme stopped` or `!notifyme off`.")
+        return
+
+    # recent observed state only, the embed may show an optimistic one during a start
+    snapshot = status_cache.get(SERVER_ID, max_age=PLAYERS_MAX_AGE)
+    if snapshot is not None and snapshot.state == target:
+        await ctx.reply(f"{_STATE_EMOJI[target]} Server {CURRENT_SERVER_NUMBER} is already {target}.")
+        return
+
+    new = notifier.subscribe(SERVER_ID, target, ctx.author.id)
+    # keep the poller checking often enough while someone is waiting
+    track_server(SERVER_ID).hurry(NOTIFY_POLL_INTERVAL)
+    others = notifier.waiting(SERVER_ID, target) - 1
+    text = (
+        f"Okay, I'll DM you when server {CURRENT_SERVER_NUMBER} is {target}."
+        if new else "You're already on the list, I've extended it."
+    )
+    if others:
+        text += f" {others} other{'s' if others != 1 else ''} waiting too."
+    await ctx.reply(text)
+
+@bot.command()
+@commands.has_role("Server Admin")
+async def perf(ctx):
+    """
+    Loop lag, task counts, Minehut requests in flight and the call sites
+    that blocked the event loop most (needs LOOP_WATCHDOG=1 for lag/sites).
+    """
+    tasks = Counter(getattr(t.get_coro(), "__qualname__", "?") for t in asyncio.all_tasks())
+    lines = []
+    if loop_watchdog.running:
+        lines.append(
+            f"Loop lag: {loop_watchdog.lag * 1000:.1f} ms now, {loop_watchdog.max_lag * 1000:.1f} ms max, "
+            f"{loop_watchdog.stalls} stalls over {loop_watchdog.threshold * 1000:.0f} ms"
+        )
+    else:
+        lines.append("Loop watchdog is off (LOOP_WATCHDOG=1 to enable).")
+    lines.append(f"Tasks: {sum(tasks.values())} ({', '.join(f'{n} {name}' for name, n in tasks.most_common(4))})")
+    lines.append(
+        f"Minehut: {minehut.inflight} in flight, {minehut.pending - minehut.inflight} waiting, "
+        f"breaker {'open' if minehut.breaker.is_open else 'closed'}"
+    )
+    top = loop_watchdog.top()
+    if top:
+        lines.append("Top blocking sites:")
+        lines.extend(f"`{site}` x{count}, worst {worst * 1000:.0f} ms" for site, count, worst in top)
+    await ctx.reply("\n".join(lines))
+
 @bot.event
 async def on_command_error(ctx, error):
     if isinstance(error, commands.MissingRole):
         await ctx.reply("🚫 You need the **Senior Admin** role to use this command.")
+    elif isinstance(error, commands.MissingPermissions):
+        await ctx.reply("🚫 You need the **Manage Channels** permission to use this command.")
     else:
         raise error
-bot.run(token, log_handler=handler, log_level=logging.DEBUG)
-
-
-
+if __name__ == "__main__":
+    log_listener = setup_logging()
+    if ACCELERATORS["uvloop"]:
+        # before bot.run, which creates the loop through asyncio.run
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    try:
+        # logging is already set up, keep discord.py from adding its own handler
+        bot.run(token, log_handler=None)
+    finally:
+        log_listener.stop()